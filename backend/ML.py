@@ -1,56 +1,10 @@
-import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
-# ============ ML CLASSIFICATION ============
-
-def generate_classification_data(problem_type, n_samples=200):
-    """Generate classification datasets"""
-    np.random.seed(42)
-    
-    if problem_type == 'linear':
-        # Linearly separable data - two Gaussian clusters
-        X1 = np.random.randn(n_samples // 2, 2) * 0.8 + np.array([2, 2])
-        X2 = np.random.randn(n_samples // 2, 2) * 0.8 + np.array([-2, -2])
-        X = np.vstack([X1, X2])
-        y = np.hstack([np.zeros(n_samples // 2), np.ones(n_samples // 2)])
-        
-    elif problem_type == 'xor':
-        # XOR pattern - requires hidden layers
-        n_per_class = n_samples // 4
-        X1 = np.random.randn(n_per_class, 2) * 0.5 + np.array([1.5, 1.5])
-        X2 = np.random.randn(n_per_class, 2) * 0.5 + np.array([-1.5, -1.5])
-        X3 = np.random.randn(n_per_class, 2) * 0.5 + np.array([1.5, -1.5])
-        X4 = np.random.randn(n_per_class, 2) * 0.5 + np.array([-1.5, 1.5])
-        X = np.vstack([X1, X2, X3, X4])
-        y = np.hstack([np.zeros(n_per_class), np.zeros(n_per_class), 
-                       np.ones(n_per_class), np.ones(n_per_class)])
-        
-    elif problem_type == 'circle':
-        # Concentric circles - inner circle is class 0, outer is class 1
-        n_per_class = n_samples // 2
-        
-        # Inner circle
-        theta1 = np.random.uniform(0, 2 * np.pi, n_per_class)
-        r1 = np.random.uniform(0, 1.5, n_per_class)
-        X1 = np.column_stack([r1 * np.cos(theta1), r1 * np.sin(theta1)])
-        
-        # Outer circle
-        theta2 = np.random.uniform(0, 2 * np.pi, n_per_class)
-        r2 = np.random.uniform(2.5, 4, n_per_class)
-        X2 = np.column_stack([r2 * np.cos(theta2), r2 * np.sin(theta2)])
-        
-        X = np.vstack([X1, X2])
-        y = np.hstack([np.zeros(n_per_class), np.ones(n_per_class)])
-    
-    # Shuffle the data
-    indices = np.random.permutation(len(X))
-    X = X[indices]
-    y = y[indices]
-    
-    return X.tolist(), y.tolist()
+from ml_common import BOUNDARY_BATCH_ELEMENTS, TrainingSchedule, boundary_grid, encode_heatmaps, pack_snapshots
 
+# ============ ML CLASSIFICATION ============
 
 class LinearClassifier(nn.Module):
     """Simple linear classifier for linearly separable data"""
@@ -60,6 +14,12 @@ class LinearClassifier(nn.Module):
     
     def forward(self, x):
         return torch.sigmoid(self.linear(x))
+    
+    @staticmethod
+    def forward_stacked(x, weights):
+        """Evaluate k weight snapshots at once: x [n, 2] -> [k, n, 1]"""
+        w, b = weights['linear.weight'], weights['linear.bias']
+        return torch.sigmoid(torch.matmul(x, w.transpose(1, 2)) + b.unsqueeze(1))
 
 
 class MLPClassifier(nn.Module):
@@ -72,11 +32,53 @@ class MLPClassifier(nn.Module):
     def forward(self, x):
         x = torch.relu(self.fc1(x))
         return torch.sigmoid(self.fc2(x))
+    
+    @staticmethod
+    def forward_stacked(x, weights):
+        """Evaluate k weight snapshots at once: x [n, 2] -> [k, n, 1]"""
+        w1, b1 = weights['fc1.weight'], weights['fc1.bias']
+        w2, b2 = weights['fc2.weight'], weights['fc2.bias']
+        x = torch.relu(torch.matmul(x, w1.transpose(1, 2)) + b1.unsqueeze(1))
+        return torch.sigmoid(torch.matmul(x, w2.transpose(1, 2)) + b2.unsqueeze(1))
+
+
+def decision_boundaries(model, stacked_weights, X, resolution=50):
+    """
+    Class-1 probability over the boundary grid for every weight snapshot,
+    quantized to uint8 and base64-encoded, one string per snapshot.
+    All snapshots go through the network together in batched matmuls,
+    chunked so no intermediate exceeds BOUNDARY_BATCH_ELEMENTS.
+    """
+    _, points = boundary_grid(X, resolution)
+    points = torch.FloatTensor(points)
+    count = next(iter(stacked_weights.values())).shape[0]
+    width = max(param.shape[0] for param in model.parameters())
+    chunk = max(1, BOUNDARY_BATCH_ELEMENTS // (len(points) * width))
+    
+    encoded = []
+    with torch.no_grad():
+        for lo in range(0, count, chunk):
+            weights = {name: history[lo:lo + chunk] for name, history in stacked_weights.items()}
+            probs = model.forward_stacked(points, weights).squeeze(2)
+            encoded.extend(encode_heatmaps(probs.numpy()))
+    return encoded
 
 
-def train_neural_network(X, y, problem_type, max_epochs=10000, snapshot_interval=10):
+def train_neural_network(X, y, problem_type, max_epochs=10000, snapshot_interval=10, columnar=False,
+                         boundary_resolution=None, summary=None, **stopping):
     """
-    Train neural network and return snapshots every N epochs
+    Train neural network and return snapshots every N epochs.
+
+    Snapshots are written into preallocated tensors while training and only
+    converted to Python lists once at the end. With columnar=True the result
+    is a single dict of per-field arrays, with predictions packed as bits,
+    instead of a list of per-snapshot dicts. With a boundary_resolution each
+    snapshot also gets a quantized decision-boundary heatmap (see
+    decision_boundaries and boundary_grid).
+
+    Keyword arguments in `stopping` configure early stopping and adaptive
+    snapshots (see TrainingSchedule). A `summary` dict, if given, is filled
+    with the stop reason and the number of epochs run.
     """
     X_tensor = torch.FloatTensor(X)
     y_tensor = torch.FloatTensor(y).reshape(-1, 1)
@@ -92,7 +94,16 @@ def train_neural_network(X, y, problem_type, max_epochs=10000, snapshot_interval
     criterion = nn.BCELoss()
     optimizer = optim.Adam(model.parameters(), lr=learning_rate)
     
-    steps = []
+    schedule = TrainingSchedule(max_epochs, snapshot_interval, **stopping)
+    n_snapshots = schedule.capacity
+    n_params = sum(param.numel() for param in model.parameters())
+    
+    epochs = torch.empty(n_snapshots, dtype=torch.long)
+    losses = torch.empty(n_snapshots)
+    accuracies = torch.empty(n_snapshots)
+    predictions = torch.empty(n_snapshots, len(X_tensor), dtype=torch.bool)
+    params = torch.empty(n_snapshots, n_params)
+    count = 0
     
     for epoch in range(max_epochs):
         # Forward pass
@@ -104,27 +115,168 @@ def train_neural_network(X, y, problem_type, max_epochs=10000, snapshot_interval
         loss.backward()
         optimizer.step()
         
-        # Record every N epochs
-        if epoch % snapshot_interval == 0 or epoch == max_epochs - 1:
+        loss_value = loss.item() if schedule.needs_loss else None
+        if schedule.check(epoch, loss_value):
             with torch.no_grad():
-                predictions = (outputs > 0.5).float().squeeze().numpy().tolist()
-                accuracy = (outputs.round() == y_tensor).float().mean().item()
+                correct = outputs.round() == y_tensor
                 
-                # Extract weights for visualization
-                weights = {}
-                for name, param in model.named_parameters():
-                    weights[name] = param.data.numpy().tolist()
-                
-                steps.append({
-                    'epoch': epoch,
-                    'loss': float(loss.item()),
-                    'accuracy': float(accuracy),
-                    'predictions': predictions,
-                    'weights': weights
-                })
-                
-                # Stop if we reach perfect accuracy
-                if accuracy == 1.0:
+                epochs[count] = epoch
+                losses[count] = loss
+                accuracies[count] = correct.float().mean()
+                predictions[count] = (outputs > 0.5).squeeze(1)
+                params[count] = nn.utils.parameters_to_vector(model.parameters())
+                count += 1
+                schedule.recorded(epoch, loss_value, bool(correct.all()))
+        
+        if schedule.done:
+            break
+    
+    if summary is not None:
+        summary.update(schedule.summary(epoch + 1))
+    
+    # Split the flat parameter history back into per-layer stacks
+    stacked = {}
+    offset = 0
+    for name, param in model.named_parameters():
+        size = param.numel()
+        stacked[name] = params[:count, offset:offset + size].reshape(count, *param.shape)
+        offset += size
+    
+    boundaries = None
+    if boundary_resolution:
+        boundaries = decision_boundaries(model, stacked, X, boundary_resolution)
+    
+    return pack_snapshots(
+        epochs[:count].numpy(), losses[:count].numpy(), accuracies[:count].numpy(),
+        predictions[:count].numpy(), {name: history.numpy() for name, history in stacked.items()},
+        columnar, boundaries
+    )
+
+
+def _batched_adam(params, grads, state, lr, betas=(0.9, 0.999), eps=1e-8):
+    """
+    One torch.optim.Adam step for k stacked models at once, with a per-model
+    learning rate `lr` of shape [k] (0 freezes a model). Same arithmetic as
+    torch's single-tensor Adam, so each model follows the path it would take
+    when trained on its own.
+    """
+    beta1, beta2 = betas
+    state['step'] = state.get('step', 0) + 1
+    bias_correction1 = 1 - beta1 ** state['step']
+    bias_correction2_sqrt = (1 - beta2 ** state['step']) ** 0.5
+    
+    for name, param in params.items():
+        grad = grads[name]
+        exp_avg = state.setdefault(('exp_avg', name), torch.zeros_like(param))
+        exp_avg_sq = state.setdefault(('exp_avg_sq', name), torch.zeros_like(param))
+        exp_avg.lerp_(grad, 1 - beta1)
+        exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+        denom = (exp_avg_sq.sqrt() / bias_correction2_sqrt).add_(eps)
+        step_size = (lr / bias_correction1).reshape(-1, *([1] * (param.dim() - 1)))
+        param.sub_(step_size * exp_avg / denom)
+
+
+def train_ensemble(X, y, problem_type, configs, max_epochs=10000, snapshot_interval=10, columnar=False,
+                   boundary_resolution=None):
+    """
+    Train one model per config ({'seed', 'learning_rate', 'hidden_size'},
+    all optional) simultaneously, as a single batched model: weights are
+    stacked along a leading model dimension and evaluated with batched
+    matmuls, so k runs cost about as much as one.
+    
+    Each model is initialized exactly as train_neural_network would under
+    torch.manual_seed(seed). Smaller hidden layers are zero-padded to the
+    largest one; padded units get zero gradients and stay zero. A model that
+    reaches perfect accuracy is frozen and stops recording, like the single
+    run breaking out of its loop.
+    
+    Returns one snapshot list (or columnar dict) per config, in order.
+    """
+    X_tensor = torch.FloatTensor(X)
+    y_tensor = torch.FloatTensor(y).reshape(-1, 1)
+    
+    linear = problem_type == 'linear'
+    templates = []
+    for config in configs:
+        if config.get('seed') is not None:
+            torch.manual_seed(config['seed'])
+        templates.append(LinearClassifier() if linear else MLPClassifier(config.get('hidden_size', 16)))
+    width = max(template.fc1.out_features for template in templates) if not linear else 1
+    
+    # Stack the initial weights, zero-padding hidden layers to `width`
+    params = {}
+    for name, param in templates[0].named_parameters():
+        shape = list(param.shape)
+        if name.startswith('fc1'):
+            shape[0] = width
+        elif name == 'fc2.weight':
+            shape[1] = width
+        params[name] = torch.zeros(len(templates), *shape)
+    for k, template in enumerate(templates):
+        for name, param in template.named_parameters():
+            params[name][k][tuple(slice(0, size) for size in param.shape)] = param.detach()
+    
+    default_lr = 0.1 if linear else 0.01
+    lr = torch.tensor([float(config.get('learning_rate', default_lr)) for config in configs])
+    forward = (LinearClassifier if linear else MLPClassifier).forward_stacked
+    adam_state = {}
+    
+    snapshot_interval = max(1, int(snapshot_interval))
+    n_snapshots = (max_epochs - 1) // snapshot_interval + 2
+    k_models = len(templates)
+    
+    epochs = torch.empty(k_models, n_snapshots, dtype=torch.long)
+    losses = torch.empty(k_models, n_snapshots)
+    accuracies = torch.empty(k_models, n_snapshots)
+    predictions = torch.empty(k_models, n_snapshots, len(X_tensor), dtype=torch.bool)
+    history = {name: torch.empty(k_models, n_snapshots, *param.shape[1:]) for name, param in params.items()}
+    counts = torch.zeros(k_models, dtype=torch.long)
+    active = torch.ones(k_models, dtype=torch.bool)
+    
+    for epoch in range(max_epochs):
+        for param in params.values():
+            param.requires_grad_(True)
+        outputs = forward(X_tensor, params)
+        per_model_loss = nn.functional.binary_cross_entropy(
+            outputs, y_tensor.expand_as(outputs), reduction='none'
+        ).mean(dim=(1, 2))
+        # Models are independent, so the gradient of the sum is each model's own
+        grads = torch.autograd.grad(per_model_loss.sum(), list(params.values()))
+        
+        with torch.no_grad():
+            for param in params.values():
+                param.requires_grad_(False)
+            _batched_adam(params, dict(zip(params, grads)), adam_state, lr * active)
+            
+            if epoch % snapshot_interval == 0 or epoch == max_epochs - 1:
+                correct = outputs.round() == y_tensor
+                models = active.nonzero().squeeze(1)
+                slots = counts[models]
+                epochs[models, slots] = epoch
+                losses[models, slots] = per_model_loss[models]
+                accuracies[models, slots] = correct[models].float().mean(dim=(1, 2))
+                predictions[models, slots] = (outputs[models] > 0.5).squeeze(2)
+                for name, param in params.items():
+                    history[name][models, slots] = param[models]
+                counts[models] += 1
+                active[models] = ~correct[models].all(dim=2).all(dim=1)
+                if not active.any():
                     break
     
-    return steps
\ No newline at end of file
+    results = []
+    for k, template in enumerate(templates):
+        count = int(counts[k])
+        # Trim the padding back off
+        stacked = {
+            name: history[name][k, :count][(slice(None), *(slice(0, size) for size in param.shape))]
+            for name, param in template.named_parameters()
+        }
+        boundaries = None
+        if boundary_resolution:
+            boundaries = decision_boundaries(template, stacked, X, boundary_resolution)
+        results.append(pack_snapshots(
+            epochs[k, :count].numpy(), losses[k, :count].numpy(), accuracies[k, :count].numpy(),
+            predictions[k, :count].numpy(), {name: values.numpy() for name, values in stacked.items()},
+            columnar, boundaries
+        ))
+    return results
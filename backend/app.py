@@ -1,16 +1,324 @@
-from flask import Flask, request, jsonify, send_from_directory
+import time
+STARTED = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+import os
 import random
+import sys
 import numpy as np
 import json
+import math
+from functools import partial
 
-import ML
+import binary
+import cache
+import compression
+import mazes
+import ml_common
 import path_finding
+import sessions
 import sorting
+import workers
 
 app = Flask(__name__, static_folder="../frontend", static_url_path="")
 CORS(app)
 
+# Seconds spent in each startup phase, served by /api/startup
+startup_report = {'imports': time.perf_counter() - STARTED}
+
+# Encoded responses of deterministic requests; ALGOVIZ_CACHE_BYTES=0 disables it
+response_cache = cache.ResponseCache(
+    max_bytes=int(os.environ.get('ALGOVIZ_CACHE_BYTES', 64 * 1024 * 1024))
+)
+
+# Recorded runs served frame range by frame range (see sessions.py)
+trace_store = sessions.TraceStore(
+    max_bytes=int(os.environ.get('ALGOVIZ_TRACE_BYTES', 256 * 1024 * 1024)),
+    ttl=float(os.environ.get('ALGOVIZ_TRACE_TTL', 600))
+)
+
+# Generated mazes by (generator, rows, cols, seed, ...), see mazes.py
+maze_cache = mazes.MazeCache(
+    max_bytes=int(os.environ.get('ALGOVIZ_MAZE_CACHE_BYTES', 32 * 1024 * 1024))
+)
+
+# Algorithm runs go to process pools; a size of 0 runs them inline. Torch
+# training gets its own group so only those workers pay for importing torch;
+# NumPy-backend training runs alongside the algorithm jobs
+worker_pool = workers.WorkerPool(
+    workers=int(os.environ.get('ALGOVIZ_WORKERS', 0)),
+    max_pending=int(os.environ.get('ALGOVIZ_MAX_PENDING', 0)),
+    timeout=float(os.environ.get('ALGOVIZ_JOB_TIMEOUT', 60)),
+    preload=('sorting', 'path_finding', 'ml_numpy')
+)
+ml_pool = workers.WorkerPool(
+    workers=int(os.environ.get('ALGOVIZ_ML_WORKERS', 0)),
+    max_pending=int(os.environ.get('ALGOVIZ_MAX_PENDING', 0)),
+    timeout=float(os.environ.get('ALGOVIZ_JOB_TIMEOUT', 60)),
+    preload=('ML',)
+)
+pool_started = time.perf_counter()
+worker_pool.start()
+ml_pool.start()
+startup_report['pools'] = time.perf_counter() - pool_started
+
+# Largest inputs accepted, beyond which requests get a 413
+MAX_ARRAY_SIZE = int(os.environ.get('ALGOVIZ_MAX_ARRAY_SIZE', 100000))
+MAX_GRID_CELLS = int(os.environ.get('ALGOVIZ_MAX_GRID_CELLS', 500 * 500))
+MAX_SAMPLES = int(os.environ.get('ALGOVIZ_MAX_SAMPLES', 10000))
+MAX_ENSEMBLE = int(os.environ.get('ALGOVIZ_MAX_ENSEMBLE', 16))
+MAX_HIDDEN_SIZE = 256
+MAX_BOUNDARY_RESOLUTION = 200
+
+# Optional /api/ml-train fields passed through to the training schedule
+STOPPING_OPTIONS = ('patience', 'min_delta', 'time_budget', 'snapshot_delta', 'max_snapshot_interval')
+
+# Pathfinding implementations by engine, then algorithm
+PATH_ENGINES = {
+    'python': {
+        'dijkstra': path_finding.dijkstra_steps,
+        'astar': path_finding.a_star_steps,
+        'bfs': path_finding.bfs_steps,
+        'dfs': path_finding.dfs_steps,
+        'bidirectional_bfs': path_finding.bidirectional_bfs_steps,
+        'bidirectional_astar': path_finding.bidirectional_a_star_steps,
+        'jps': path_finding.jps_steps
+    },
+    'numpy': {
+        'dijkstra': path_finding.dijkstra_array_steps,
+        'astar': path_finding.a_star_array_steps,
+        'bfs': path_finding.bfs_array_steps,
+        'dfs': path_finding.dfs_array_steps,
+        'bidirectional_bfs': path_finding.bidirectional_bfs_array_steps,
+        'bidirectional_astar': path_finding.bidirectional_a_star_array_steps,
+        'jps': path_finding.jps_array_steps
+    }
+}
+
+# Algorithms that take `diagonal: true` (8-connected moves)
+DIAGONAL_ALGORITHMS = ('dijkstra', 'astar')
+
+# ============ LAZY ML ============
+
+def load_ml():
+    """
+    ML pulls in torch (seconds of startup and hundreds of MB per process),
+    so it is only imported by the first torch-backend training request
+    """
+    if 'ML' not in sys.modules:
+        loading = time.perf_counter()
+        import ML
+        startup_report['ml_import'] = time.perf_counter() - loading
+    import ML
+    return ML
+
+@app.errorhandler(workers.PoolBusy)
+def pool_busy(error):
+    return jsonify({'error': 'Server is busy, try again shortly'}), 429
+
+@app.errorhandler(workers.JobTimeout)
+def job_timeout(error):
+    return jsonify({'error': 'Algorithm run timed out'}), 504
+
+# ============ CACHING ============
+
+# Response body encodings, negotiated through the Accept header
+BODY_MIMETYPES = {
+    'json': 'application/json',
+    'binary': binary.MIMETYPE,
+    'ndjson': 'application/x-ndjson'
+}
+
+def body_format():
+    """'binary' when the client prefers the binary encoding over JSON, else 'json'"""
+    return 'binary' if request.accept_mimetypes.best == binary.MIMETYPE else 'json'
+
+def cache_lookup(endpoint, data, fmt=None):
+    """Returns the cache key for a request and the cached response, if any"""
+    fmt = fmt or body_format()
+    key = response_cache.key(f'{endpoint}.{fmt}', data)
+    variants = response_cache.get(key)
+    if not variants:
+        return key, None
+
+    body = variants.get('identity')
+    encoding = compression.choose_encoding(request.accept_encodings, len(body) if body else None)
+    if encoding in variants:
+        return key, body_response(variants[encoding], fmt, encoding)
+    if body is None:
+        # Only a compressed copy is left
+        stored, compressed = next(iter(variants.items()))
+        body = compression.decompress(compressed, stored)
+        response_cache.put(key, body)
+    return key, encoded_body(body, fmt, key, store=False)
+
+def encoded_body(body, fmt='json', key=None, store=True):
+    """
+    Response for an already encoded body, compressed if the client accepts it.
+    With a `key`, the body (if `store`) and its compressed copy are cached.
+    """
+    if key is not None and store:
+        response_cache.put(key, body)
+    encoding = compression.choose_encoding(request.accept_encodings, len(body))
+    if encoding:
+        body = compression.compress(body, encoding)
+        if key is not None:
+            response_cache.put(key, body, encoding)
+    return body_response(body, fmt, encoding)
+
+def body_response(body, fmt, encoding=None):
+    response = Response(body, mimetype=BODY_MIMETYPES[fmt])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.update(['Accept', 'Accept-Encoding'])
+    return response
+
+# ============ STREAMING ============
+
+def wants_stream(data):
+    """Clients opt into NDJSON either with `stream: true` or the Accept header"""
+    return bool(data.get('stream')) or request.accept_mimetypes.best == 'application/x-ndjson'
+
+def stream_body(chunks, key=None):
+    """
+    Stream NDJSON chunks (see workers.ndjson_lines) as they are produced. A
+    run that times out ends the stream with an {"error": ...} line. With a
+    `key`, a body that completes is cached (unless it outgrows the cache)
+    and later served whole by cache_lookup.
+    """
+    def generate():
+        kept = [] if key is not None and response_cache.enabled else None
+        size = 0
+        try:
+            for chunk in chunks:
+                if kept is not None:
+                    size += len(chunk)
+                    if size > response_cache.max_bytes:
+                        kept = None
+                    else:
+                        kept.append(chunk)
+                yield chunk
+        except workers.JobTimeout:
+            yield json.dumps({'error': 'Algorithm run timed out'}) + '\n'
+            return
+        if kept is not None:
+            response_cache.put(key, ''.join(kept).encode())
+
+    body = generate()
+    encoding = compression.choose_encoding(request.accept_encodings, None)
+    if encoding:
+        body = compression.compress_chunks(body, encoding)
+    response = Response(stream_with_context(body), mimetype=BODY_MIMETYPES['ndjson'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.update(['Accept', 'Accept-Encoding'])
+    return response
+
+# ============ TRACE SESSIONS ============
+
+def wants_session(data):
+    """`session: true` records the run server-side instead of returning its steps"""
+    return bool(data.get('session'))
+
+def start_session(func, args, meta, expand):
+    """
+    Record a run and respond with its trace id and step count (plus `meta`);
+    frames are then read through /api/trace/<id>
+    """
+    count, segments = worker_pool.run(workers.record_job, func, args)
+    session = sessions.TraceSession(meta, count, segments, expand)
+    if not trace_store.add(session):
+        return jsonify({'error': 'Trace too large to keep'}), 413
+    return jsonify({'trace_id': session.id, 'total_steps': count, **meta})
+
+# ============ INPUT CHECKS ============
+
+def is_int(value, low, high=None):
+    """Whether a JSON value is an integer (not a boolean) from `low` to `high`"""
+    return type(value) is int and value >= low and (high is None or value <= high)
+
+def is_number(value, low=0):
+    """Whether a JSON value is a finite number (not a boolean) of at least `low`"""
+    return type(value) in (int, float) and math.isfinite(value) and value >= low
+
+def ensemble_config_error(config):
+    """Error message for an ensemble model configuration, or None if it is valid"""
+    if not isinstance(config, dict):
+        return 'ensemble must be a list of configurations'
+    if not is_int(config.get('hidden_size', 16), 1, MAX_HIDDEN_SIZE):
+        return f'hidden_size must be an integer from 1 to {MAX_HIDDEN_SIZE}'
+    learning_rate = config.get('learning_rate')
+    if learning_rate is not None and not (is_number(learning_rate) and learning_rate > 0):
+        return 'learning_rate must be a positive number'
+    seed = config.get('seed')
+    if seed is not None and not is_int(seed, 0):
+        return 'seed must be a non-negative integer'
+    return None
+
+# ============ GENERATED MAZES ============
+
+def maze_ref(data):
+    """
+    The generated maze a request names by `generator` (default 'noise'),
+    `rows`, `cols`, `seed`, `density` and `connected`. Without a seed one is
+    drawn, so the response can name the maze for later requests.
+    Returns (ref, error message).
+    """
+    generator = data.get('generator', 'noise')
+    if generator not in mazes.GENERATORS:
+        return None, 'Unknown generator'
+
+    rows = data.get('rows', 20)
+    cols = data.get('cols', 20)
+    if not all(type(size) is int and size > 0 for size in (rows, cols)):
+        return None, 'rows and cols must be positive integers'
+
+    density = data.get('density')
+    if density is not None and not (type(density) in (int, float) and 0 <= density <= 1):
+        return None, 'density must be between 0 and 1'
+
+    seed = data.get('seed')
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    elif type(seed) is not int or seed < 0:
+        return None, 'seed must be a non-negative integer'
+
+    ref = {'generator': generator, 'rows': rows, 'cols': cols, 'seed': seed}
+    if density is not None:
+        ref['density'] = density
+    if data.get('connected'):
+        ref['connected'] = True
+    return ref, None
+
+def maze_error(maze):
+    """Why a posted maze is unusable, or None. Cells hold 0..MAX_TERRAIN_COST (see path_finding)"""
+    try:
+        grid = np.array(maze)
+    except ValueError:
+        return 'Maze rows must all be the same length'
+    if grid.ndim != 2 or grid.size == 0:
+        return 'Maze must be a non-empty grid'
+    # numpy turns true/false into 1/0 next to integers, so check the JSON values themselves
+    if (grid.dtype.kind not in 'iu' or not all(type(cell) is int for row in maze for cell in row)
+            or grid.min() < 0 or grid.max() > path_finding.MAX_TERRAIN_COST):
+        return f'Maze cells must be integers from 0 to {path_finding.MAX_TERRAIN_COST}'
+    return None
+
+def endpoints_error(start, end, rows, cols):
+    """Why start/end are unusable in a rows x cols maze, or None"""
+    for cell in (start, end):
+        if not (isinstance(cell, list) and len(cell) == 2 and all(type(value) is int for value in cell)):
+            return 'Start and end must be [row, col] pairs of integers'
+        if not (0 <= cell[0] < rows and 0 <= cell[1] < cols):
+            return 'Start and end must lie inside the maze'
+    return None
+
+def load_maze(ref):
+    """The (immutable, shared) path_finding.Grid of a maze_ref"""
+    return maze_cache.get(ref['generator'], ref['rows'], ref['cols'], ref['seed'],
+                          ref.get('density'), ref.get('connected', False))
+
 # ============ API ENDPOINTS ============
 
 @app.route('/')
@@ -22,57 +330,299 @@ def sort_array():
     data = request.json
     array = data.get('array', [])
     algorithm = data.get('algorithm', 'bubble')
+    trace_format = data.get('format', 'full')
+
+    if len(array) > MAX_ARRAY_SIZE:
+        return jsonify({'error': f'Array too large (max {MAX_ARRAY_SIZE} elements)'}), 413
+
+    cache_key = None
+    if not wants_session(data):
+        cache_key, cached = cache_lookup('sort', data, 'ndjson' if wants_stream(data) else None)
+        if cached:
+            return cached
 
     algorithms = {
-        'bubble': sorting.bubble_sort,
-        'quick': sorting.quick_sort,
-        'merge': sorting.merge_sort,
-        'insertion': sorting.insertion_sort,
-        'selection': sorting.selection_sort
+        'bubble': sorting.bubble_sort_steps,
+        'quick': sorting.quick_sort_steps,
+        'merge': sorting.merge_sort_steps,
+        'insertion': sorting.insertion_sort_steps,
+        'selection': sorting.selection_sort_steps,
+        'heap': sorting.heap_sort_steps,
+        'shell': sorting.shell_sort_steps,
+        'counting': sorting.counting_sort_steps,
+        'radix': sorting.radix_sort_steps,
+        'bottom_up_merge': sorting.bottom_up_merge_sort_steps,
+        'intro': sorting.intro_sort_steps
     }
 
     func = algorithms.get(algorithm)
     if not func:
         return jsonify({'error': 'Unknown algorithm'}), 400
-    
-    return jsonify({'steps': func(array), 'original': array})
+
+    if algorithm in ('counting', 'radix'):
+        if not all(type(value) is int for value in array):
+            return jsonify({'error': 'Counting and radix sort need integers'}), 400
+        if algorithm == 'counting' and array and max(array) - min(array) > sorting.MAX_COUNTING_RANGE:
+            return jsonify({'error': f'Value range too large for counting sort (max {sorting.MAX_COUNTING_RANGE})'}), 400
+
+    if trace_format not in sorting.TRACE_FORMATS:
+        return jsonify({'error': 'Unknown format'}), 400
+
+    max_steps = data.get('max_steps')
+    # StepSampler always keeps the final step plus at least one more
+    if max_steps is not None and not is_int(max_steps, 2):
+        return jsonify({'error': 'max_steps must be an integer of at least 2'}), 400
+    if max_steps and trace_format != 'full':
+        return jsonify({'error': 'max_steps is only supported with the full format'}), 400
+
+    sorted_format = data.get('sorted_format', 'indices')
+    if sorted_format not in sorting.SORTED_FORMATS:
+        return jsonify({'error': 'Unknown sorted_format'}), 400
+
+    meta = {'original': array}
+    trace_options = {}
+    if sorted_format != 'indices':
+        trace_options['sorted_format'] = sorted_format
+        meta['sorted_format'] = sorted_format
+    if trace_format == 'delta':
+        keyframe_interval = data.get('keyframe_interval', sorting.KEYFRAME_INTERVAL)
+        if not is_int(keyframe_interval, 1):
+            return jsonify({'error': 'keyframe_interval must be a positive integer'}), 400
+        trace_options['keyframe_interval'] = keyframe_interval
+        meta.update({'format': 'delta', 'keyframe_interval': keyframe_interval})
+
+    if wants_session(data):
+        if max_steps:
+            return jsonify({'error': 'max_steps cannot be combined with session'}), 400
+        if sorted_format != 'indices':
+            return jsonify({'error': 'Session frames list sorted indices'}), 400
+        return start_session(func, (array,), {'original': array}, sorting.expand_delta)
+
+    if wants_stream(data):
+        chunks = worker_pool.stream(workers.sort_stream_job, func, array, trace_format, trace_options,
+                                    max_steps, meta)
+        return stream_body(chunks, cache_key)
+
+    fmt = body_format()
+    body = worker_pool.run(workers.sort_job, func, array, trace_format, trace_options, max_steps, meta, fmt)
+    return encoded_body(body, fmt, cache_key)
 
 @app.route('/api/pathfinding', methods=['POST'])
 def pathfinding():
     data = request.json
-    rows = data.get('rows', 20)
-    cols = data.get('cols', 20)
     start = data.get('start')
     end = data.get('end')
     algorithm = data.get('algorithm', 'dijkstra')
+    trace_format = data.get('format', 'full')
+    engine = data.get('engine', 'python')
     maze = data.get('maze')
-    
-    if not maze:
-        maze = path_finding.generate_maze(rows, cols)
-    
+
+    ref = None
+    if maze:
+        error = maze_error(maze)
+        if error:
+            return jsonify({'error': error}), 400
+        rows, cols = len(maze), len(maze[0])
+    else:
+        ref, error = maze_ref(data)
+        if error:
+            return jsonify({'error': error}), 400
+        rows, cols = ref['rows'], ref['cols']
+    if rows * cols > MAX_GRID_CELLS:
+        return jsonify({'error': f'Maze too large (max {MAX_GRID_CELLS} cells)'}), 413
+
+    # Without a posted maze or a seed the maze is random, so the result is too
+    cache_key = None
+    deterministic = maze or data.get('seed') is not None
+    if deterministic and not wants_session(data):
+        cache_key, cached = cache_lookup('pathfinding', data, 'ndjson' if wants_stream(data) else None)
+        if cached:
+            return cached
+
+    algorithms = PATH_ENGINES.get(engine)
+    if not algorithms:
+        return jsonify({'error': 'Unknown engine'}), 400
+
+    func = algorithms.get(algorithm)
+    if not func:
+        return jsonify({'error': 'Unknown algorithm'}), 400
+
+    diagonal = bool(data.get('diagonal'))
+    if diagonal:
+        if algorithm not in DIAGONAL_ALGORITHMS:
+            return jsonify({'error': 'Diagonal moves are only supported by dijkstra and astar'}), 400
+        func = partial(func, diagonal=True)
+
+    if ref:
+        # Both engines search the shared Grid; the list is only for the response
+        grid = load_maze(ref)
+        maze = grid.tolist()
+    else:
+        grid = path_finding.Grid.from_maze(maze) if engine == 'numpy' else maze
+
     if not start:
         start = [0, 0]
     if not end:
         end = [rows - 1, cols - 1]
+    error = endpoints_error(start, end, rows, cols)
+    if error:
+        return jsonify({'error': error}), 400
 
-    algorithms = {
-        'dijkstra': path_finding.dijkstra,
-        'astar': path_finding.a_star,
-        'bfs': path_finding.bfs,
-        'dfs': path_finding.dfs
+    if trace_format not in path_finding.TRACE_FORMATS:
+        return jsonify({'error': 'Unknown format'}), 400
+
+    meta = {
+        'maze': maze,
+        'start': start,
+        'end': end
     }
-    
-    func = algorithms.get(algorithm)
-    if not func:
+    trace_options = {}
+    if trace_format == 'delta':
+        keyframe_interval = data.get('keyframe_interval', 0)
+        if not is_int(keyframe_interval, 0):
+            return jsonify({'error': 'keyframe_interval must be a non-negative integer'}), 400
+        trace_options['keyframe_interval'] = keyframe_interval
+        meta.update({'format': 'delta', 'keyframe_interval': keyframe_interval})
+    if diagonal:
+        meta['diagonal'] = True
+    if ref:
+        meta['maze_ref'] = ref
+
+    if wants_session(data):
+        meta = {'maze': maze, 'start': start, 'end': end}
+        if diagonal:
+            meta['diagonal'] = True
+        if ref:
+            meta['maze_ref'] = ref
+        return start_session(func, (grid, tuple(start), tuple(end)), meta, path_finding.expand_delta)
+
+    if wants_stream(data):
+        chunks = worker_pool.stream(workers.pathfinding_stream_job, func, grid, tuple(start), tuple(end),
+                                    trace_format, trace_options, meta)
+        return stream_body(chunks, cache_key)
+
+    fmt = body_format()
+    body = worker_pool.run(workers.pathfinding_job, func, grid, tuple(start), tuple(end),
+                           trace_format, trace_options, meta, fmt)
+    return encoded_body(body, fmt, cache_key)
+
+@app.route('/api/pathfinding/compare', methods=['POST'])
+def compare_pathfinding():
+    """
+    Run several algorithms on one maze, side by side in the worker pool.
+    Takes the /api/pathfinding fields plus `algorithms` (default: all of the
+    engine's, or DIAGONAL_ALGORITHMS with `diagonal`) and `steps: false` to
+    return metrics only. Without a posted
+    maze the one named by maze_ref's fields is used for every engine.
+    The body is always JSON, built from each run's encoded result.
+    """
+    data = request.json
+    engine = data.get('engine', 'python')
+    trace_format = data.get('format', 'full')
+    maze = data.get('maze')
+
+    ref = None
+    if maze:
+        error = maze_error(maze)
+        if error:
+            return jsonify({'error': error}), 400
+        rows, cols = len(maze), len(maze[0])
+    else:
+        ref, error = maze_ref(data)
+        if error:
+            return jsonify({'error': error}), 400
+        rows, cols = ref['rows'], ref['cols']
+    if rows * cols > MAX_GRID_CELLS:
+        return jsonify({'error': f'Maze too large (max {MAX_GRID_CELLS} cells)'}), 413
+
+    algorithms = PATH_ENGINES.get(engine)
+    if not algorithms:
+        return jsonify({'error': 'Unknown engine'}), 400
+
+    diagonal = bool(data.get('diagonal'))
+    names = list(dict.fromkeys(data.get('algorithms') or (DIAGONAL_ALGORITHMS if diagonal else algorithms)))
+    if any(name not in algorithms for name in names):
         return jsonify({'error': 'Unknown algorithm'}), 400
-    
-    steps = func(maze, tuple(start), tuple(end))
-    return jsonify({
-        'steps': steps,
-        'maze': maze,
+    if diagonal and any(name not in DIAGONAL_ALGORITHMS for name in names):
+        return jsonify({'error': 'Diagonal moves are only supported by dijkstra and astar'}), 400
+    funcs = {name: partial(algorithms[name], diagonal=True) if diagonal else algorithms[name] for name in names}
+
+    if trace_format not in path_finding.TRACE_FORMATS:
+        return jsonify({'error': 'Unknown format'}), 400
+
+    cache_key = None
+    if maze or data.get('seed') is not None:
+        cache_key, cached = cache_lookup('compare', data, 'json')
+        if cached:
+            return cached
+
+    grid = load_maze(ref) if ref else path_finding.Grid.from_maze(maze)
+
+    start = data.get('start') or [0, 0]
+    end = data.get('end') or [rows - 1, cols - 1]
+    error = endpoints_error(start, end, rows, cols)
+    if error:
+        return jsonify({'error': error}), 400
+
+    meta = {
+        'maze': maze or grid.tolist(),
         'start': start,
         'end': end
-    })
+    }
+    trace_options = {}
+    if trace_format == 'delta':
+        keyframe_interval = data.get('keyframe_interval', 0)
+        if not is_int(keyframe_interval, 0):
+            return jsonify({'error': 'keyframe_interval must be a non-negative integer'}), 400
+        trace_options['keyframe_interval'] = keyframe_interval
+        meta.update({'format': 'delta', 'keyframe_interval': keyframe_interval})
+    if diagonal:
+        meta['diagonal'] = True
+    if ref:
+        meta['maze_ref'] = ref
+
+    include_steps = data.get('steps', True) is not False
+    bodies = worker_pool.run_all([
+        (workers.compare_job, (funcs[name], grid, tuple(start), tuple(end), trace_format, trace_options,
+                               include_steps))
+        for name in names
+    ])
+
+    # {"results": {name: result, ...}, **meta} without decoding the results
+    results = b','.join(json.dumps(name).encode() + b':' + body for name, body in zip(names, bodies))
+    body = b'{"results":{' + results + b'},' + json.dumps(meta, separators=(',', ':')).encode()[1:]
+    return encoded_body(body, 'json', cache_key)
+
+@app.route('/api/trace/<trace_id>', methods=['GET'])
+def trace_frames(trace_id):
+    """Full-format steps `from` (inclusive) to `to` (exclusive) of a recorded run"""
+    session = trace_store.get(trace_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired trace'}), 404
+
+    lo = request.args.get('from', 0, type=int)
+    hi = request.args.get('to', lo + sessions.MAX_RANGE, type=int)
+    hi = min(hi, session.count, lo + sessions.MAX_RANGE)
+    if lo < 0 or lo > hi:
+        return jsonify({'error': 'Invalid range'}), 400
+
+    steps = session.frames(lo, hi) if lo < hi else []
+    fmt = body_format()
+    body = workers.encode({'trace_id': trace_id, 'from': lo, 'to': hi, 'total_steps': session.count,
+                           'steps': steps}, fmt)
+    return encoded_body(body, fmt)
+
+@app.route('/api/trace', methods=['GET'])
+def trace_stats():
+    return jsonify(trace_store.stats())
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    return jsonify({**response_cache.stats(), 'mazes': maze_cache.stats()})
+
+@app.route('/api/startup', methods=['GET'])
+def startup_stats():
+    return jsonify({**startup_report, 'ml_loaded': 'ML' in sys.modules})
 
 @app.route('/api/ml-data', methods=['POST'])
 def ml_data():
@@ -80,7 +630,7 @@ def ml_data():
     problem_type = data.get('problem_type', 'linear')
     
     # Generate data
-    X, y = ML.generate_classification_data(problem_type, n_samples=200)
+    X, y = ml_common.generate_classification_data(problem_type, n_samples=200)
     
     return jsonify({
         'data': {
@@ -96,13 +646,66 @@ def ml_train():
     X = data.get('X')
     y = data.get('y')
     problem_type = data.get('problem_type', 'linear')
+    if len(X) > MAX_SAMPLES:
+        return jsonify({'error': f'Too many samples (max {MAX_SAMPLES})'}), 413
+    snapshot_interval = data.get('snapshot_interval', 1)
+    if not is_int(snapshot_interval, 1):
+        return jsonify({'error': 'snapshot_interval must be a positive integer'}), 400
+    trace_format = data.get('format', 'full')
+    if trace_format not in ('full', 'columnar'):
+        return jsonify({'error': 'Unknown format'}), 400
+    columnar = trace_format == 'columnar'
+    boundary_resolution = data.get('boundary_resolution')
+    if boundary_resolution is not None and not is_int(boundary_resolution, 1, MAX_BOUNDARY_RESOLUTION):
+        return jsonify({'error': f'boundary_resolution must be an integer from 1 to {MAX_BOUNDARY_RESOLUTION}'}), 400
+    backend = data.get('backend', 'torch')
+    if backend not in workers.ML_BACKENDS:
+        return jsonify({'error': 'Unknown backend'}), 400
+    # A list of {seed, learning_rate, hidden_size} trains that many models at once
+    ensemble = data.get('ensemble')
+    if ensemble is not None:
+        if backend != 'torch':
+            return jsonify({'error': 'Ensembles need the torch backend'}), 400
+        if not isinstance(ensemble, list) or not ensemble:
+            return jsonify({'error': 'ensemble must be a list of configurations'}), 400
+        if len(ensemble) > MAX_ENSEMBLE:
+            return jsonify({'error': f'Too many models (max {MAX_ENSEMBLE})'}), 413
+        for config in ensemble:
+            error = ensemble_config_error(config)
+            if error:
+                return jsonify({'error': error}), 400
+    stopping = {name: data[name] for name in STOPPING_OPTIONS if data.get(name) is not None}
+    for name, value in stopping.items():
+        if not is_number(value):
+            return jsonify({'error': f'{name} must be a non-negative number'}), 400
+    if stopping and ensemble is not None:
+        return jsonify({'error': 'Early stopping is not supported for ensembles'}), 400
     
-    # Train the network
-    steps = ML.train_neural_network(X, y, problem_type, max_epochs=1000, snapshot_interval=1)
+    meta = {}
+    if boundary_resolution:
+        meta['boundary'] = {'bounds': ml_common.boundary_bounds(X), 'resolution': boundary_resolution}
     
-    return jsonify({
-        'steps': steps
-    })
+    # Train the network
+    train_options = {
+        'max_epochs': 1000,
+        'snapshot_interval': snapshot_interval,
+        'columnar': columnar,
+        'boundary_resolution': boundary_resolution
+    }
+    if backend == 'torch' and not ml_pool.executor:
+        # Training runs inline, so this process imports ML now; do it here to time it
+        load_ml()
+    fmt = body_format()
+    if ensemble is not None:
+        body = ml_pool.run(workers.ml_ensemble_job, X, y, problem_type, ensemble, train_options, meta, fmt)
+    else:
+        train_options.update(stopping)
+        pool = ml_pool if backend == 'torch' else worker_pool
+        body = pool.run(workers.ml_train_job, X, y, problem_type, train_options, meta, backend, fmt)
+    return encoded_body(body, fmt)
+
+startup_report['total'] = time.perf_counter() - STARTED
+app.logger.info('AlgoViz ready in %.2fs (ML loaded on first use)', startup_report['total'])
 
 if __name__ == '__main__':
     app.run(debug=True, port=8080)
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""
+Benchmarks for the algorithm modules and the API endpoints.
+
+Every case reports wall time, peak traced memory, step count and the size
+of the JSON it serializes to. Runs can be saved as a baseline and later
+runs compared against it to flag regressions.
+
+    python benchmark.py
+    python benchmark.py --suite sorting --sizes 10,100,1000
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import ml_common
+import path_finding
+import sorting
+
+SORT_SIZES = [10, 100, 1000, 5000]
+GRID_SIZES = [10, 50, 100, 300]
+PROBLEM_TYPES = ['linear', 'xor', 'circle']
+
+SORT_ALGORITHMS = {
+    'bubble': sorting.bubble_sort_steps,
+    'quick': sorting.quick_sort_steps,
+    'merge': sorting.merge_sort_steps,
+    'insertion': sorting.insertion_sort_steps,
+    'selection': sorting.selection_sort_steps,
+    'heap': sorting.heap_sort_steps,
+    'shell': sorting.shell_sort_steps,
+    'counting': sorting.counting_sort_steps,
+    'radix': sorting.radix_sort_steps,
+    'bottom_up_merge': sorting.bottom_up_merge_sort_steps,
+    'intro': sorting.intro_sort_steps
+}
+
+PATH_ALGORITHMS = {
+    'dijkstra': (path_finding.dijkstra_steps, path_finding.dijkstra_array_steps),
+    'astar': (path_finding.a_star_steps, path_finding.a_star_array_steps),
+    'bfs': (path_finding.bfs_steps, path_finding.bfs_array_steps),
+    'dfs': (path_finding.dfs_steps, path_finding.dfs_array_steps),
+    'bidirectional_bfs': (path_finding.bidirectional_bfs_steps, path_finding.bidirectional_bfs_array_steps),
+    'bidirectional_astar': (path_finding.bidirectional_a_star_steps, path_finding.bidirectional_a_star_array_steps),
+    'jps': (path_finding.jps_steps, path_finding.jps_array_steps)
+}
+
+# ============ MEASUREMENT ============
+
+class Budget:
+    """Wall-clock allowance for one case; long traces stop early once it runs out"""
+    def __init__(self, seconds):
+        self.deadline = time.perf_counter() + seconds
+
+    def expired(self):
+        return time.perf_counter() > self.deadline
+
+
+def consume(steps, budget):
+    """Drain a step generator, serializing each step. Returns (steps, bytes, finished)"""
+    count = size = 0
+    for step in steps:
+        count += 1
+        size += len(json.dumps(step))
+        if count % 1024 == 0 and budget.expired():
+            return count, size, False
+    return count, size, True
+
+
+def measure(run, seconds, memory):
+    """
+    Time `run(budget)`, which returns (steps, bytes, finished), and optionally
+    repeat it under tracemalloc to get its peak allocation.
+    """
+    start = time.perf_counter()
+    count, size, finished = run(Budget(seconds))
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if memory and finished:
+        tracemalloc.start()
+        run(Budget(seconds * 10))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'seconds': elapsed,
+        'peak_bytes': peak,
+        'steps': count,
+        'payload_bytes': size,
+        'status': 'ok' if finished else 'timeout'
+    }
+
+
+def run_series(results, suite, target, sizes, make_run, options, fmt=None):
+    """Runs one target over increasing sizes, skipping the rest once one times out"""
+    exhausted = False
+    for size in sizes:
+        case_id = '/'.join(str(part) for part in (suite, target, size, fmt) if part is not None)
+        if exhausted:
+            results.append({'id': case_id, 'status': 'skipped'})
+            continue
+        result = measure(make_run(size), options.budget, options.memory)
+        result['id'] = case_id
+        results.append(result)
+        report(result)
+        exhausted = result['status'] == 'timeout'
+
+# ============ SUITES ============
+
+def random_array(size):
+    rng = random.Random(size)
+    return [rng.randint(1, 1000) for _ in range(size)]
+
+
+def bench_sorting(results, options):
+    for fmt in options.formats:
+        for name, func in SORT_ALGORITHMS.items():
+            def make_run(size, func=func, fmt=fmt):
+                array = random_array(size)
+                return lambda budget: consume(func(array, fmt), budget)
+            run_series(results, 'sorting', name, options.sizes or SORT_SIZES, make_run, options, fmt)
+
+
+def bench_pathfinding(results, options):
+    for fmt in options.formats:
+        for name, (func, array_func) in PATH_ALGORITHMS.items():
+            for engine, engine_func in (('python', func), ('numpy', array_func)):
+                def make_run(size, engine=engine, engine_func=engine_func, fmt=fmt):
+                    grid = path_finding.Grid.from_array(
+                        path_finding.generate_maze_array(size, size, seed=size, density=options.density))
+                    maze = grid.tolist() if engine == 'python' else grid
+                    end = (size - 1, size - 1)
+
+                    def run(budget):
+                        return consume(engine_func(maze, (0, 0), end, fmt), budget)
+                    return run
+                run_series(results, 'pathfinding', f'{name}-{engine}', options.grid_sizes or GRID_SIZES,
+                           make_run, options, fmt)
+
+
+def bench_ml(results, options):
+    import torch
+    import ML
+
+    for problem_type in PROBLEM_TYPES:
+        X, y = ml_common.generate_classification_data(problem_type)
+
+        def run(budget, X=X, y=y, problem_type=problem_type):
+            torch.manual_seed(0)
+            steps = ML.train_neural_network(X, y, problem_type, max_epochs=1000, snapshot_interval=1)
+            return len(steps), len(json.dumps(steps)), True
+        result = measure(run, options.budget, options.memory)
+        result['id'] = f'ml/{problem_type}'
+        results.append(result)
+        report(result)
+
+
+def bench_endpoints(results, options):
+    import app as server
+
+    # Every request must reach the algorithms
+    server.response_cache.max_bytes = 0
+    client = server.app.test_client()
+
+    def post(url, body):
+        def run(budget):
+            response = client.post(url, json=body)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} returned {response.status_code}: {response.get_data(as_text=True)}')
+            payload = response.get_json()
+            steps = payload.get('steps') or payload.get('snapshots', {}).get('epochs', [])
+            return len(steps), len(response.get_data()), True
+        return run
+
+    for fmt in options.formats:
+        for name in SORT_ALGORITHMS:
+            def make_run(size, name=name, fmt=fmt):
+                return post('/api/sort', {'array': random_array(size), 'algorithm': name, 'format': fmt})
+            run_series(results, 'api/sort', name, options.sizes or SORT_SIZES, make_run, options, fmt)
+
+        for name in PATH_ALGORITHMS:
+            def make_run(size, name=name, fmt=fmt):
+                maze = path_finding.generate_maze_array(size, size, seed=size, density=options.density).tolist()
+                return post('/api/pathfinding', {
+                    'maze': maze, 'rows': size, 'cols': size, 'algorithm': name, 'format': fmt
+                })
+            run_series(results, 'api/pathfinding', name, options.grid_sizes or GRID_SIZES,
+                       make_run, options, fmt)
+
+    for problem_type in PROBLEM_TYPES:
+        X, y = ml_common.generate_classification_data(problem_type)
+        result = measure(post('/api/ml-train', {'X': X, 'y': y, 'problem_type': problem_type}),
+                         options.budget, options.memory)
+        result['id'] = f'api/ml-train/{problem_type}'
+        results.append(result)
+        report(result)
+
+
+SUITES = {
+    'sorting': bench_sorting,
+    'pathfinding': bench_pathfinding,
+    'ml': bench_ml,
+    'endpoints': bench_endpoints
+}
+
+# ============ REPORTING ============
+
+def report(result):
+    peak = result['peak_bytes']
+    peak = f'{peak / 1e6:>9.2f}MB' if peak is not None else f"{'-':>11}"
+    print(f"{result['id']:<40} {result['seconds']:>9.4f}s "
+          f"{peak} {result['steps']:>10} steps "
+          f"{result['payload_bytes'] / 1e6:>10.2f}MB json  {result['status']}", flush=True)
+
+
+def compare(results, baseline, threshold):
+    """Cases that got slower or bigger than the baseline by more than `threshold`"""
+    previous = {result['id']: result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result['id'])
+        if not old or result['status'] != 'ok' or old.get('status') != 'ok':
+            continue
+        for field in ('seconds', 'peak_bytes', 'payload_bytes'):
+            before, after = old.get(field), result.get(field)
+            if not before or after is None:
+                continue
+            # Ignore timing noise on cases that take a few milliseconds
+            if field == 'seconds' and after < 0.01:
+                continue
+            if after > before * (1 + threshold):
+                regressions.append((result['id'], field, before, after))
+    return regressions
+
+
+def parse_sizes(text):
+    return [int(size) for size in text.split(',')] if text else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES),
+                        help='suite to run (repeatable, default: all)')
+    parser.add_argument('--sizes', type=parse_sizes, help='comma-separated array sizes')
+    parser.add_argument('--grid-sizes', type=parse_sizes, help='comma-separated square grid sizes')
+    parser.add_argument('--formats', default='full,delta', type=lambda text: text.split(','),
+                        help='trace formats for sorting and pathfinding (default: full,delta)')
+    parser.add_argument('--density', type=float, default=0.0,
+                        help='wall density of benchmark mazes (default: 0, open grids expand the most cells)')
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help='seconds per case; larger sizes of a target are skipped after a timeout')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='skip the tracemalloc pass that measures peak memory')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative increase that counts as a regression (default: 0.25)')
+    options = parser.parse_args(argv)
+
+    results = []
+    for suite in options.suite or list(SUITES):
+        SUITES[suite](results, options)
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if options.compare:
+        with open(options.compare) as f:
+            regressions = compare(results, json.load(f), options.threshold)
+        for case_id, field, before, after in regressions:
+            print(f'REGRESSION {case_id} {field}: {before:.6g} -> {after:.6g}')
+        if regressions:
+            return 1
+        print('No regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import json
+import struct
+from array import array
+
+import numpy as np
+
+# ============ BINARY RESPONSES ============
+# Opt-in alternative to JSON bodies, requested with `Accept: MIMETYPE`.
+#
+# Layout (little-endian):
+#   b'AVB1' | uint32 header length | header JSON | padding | buffers
+# The header is {"buffers": [...], "body": ...}. "body" is the response with
+# every large numeric list swapped for a reference {"$": [buffer, offset, *shape]}.
+# Each buffer is {"type", "offset", "length" (elements)} and holds every list
+# of its type back to back. Buffers start at the first multiple of 8 after
+# the header; their offsets count bytes from there and are 8-aligned.
+# Integer lists use the narrowest of uint8/uint16/uint32/int32 that fits,
+# float lists float32 when that is lossless, and lists of only 0.0/1.0
+# (ML predictions) one bit per value. Reference offsets count elements, or
+# bytes for "bits". frontend/js/binary.js turns it back into the same
+# objects JSON.parse would produce.
+
+MIMETYPE = 'application/x-algoviz-binary'
+MAGIC = b'AVB1'
+
+# Shorter lists stay inline: the reference would be about as long
+MIN_PACKED_LENGTH = 16
+
+INT_TYPES = [
+    # (typecode, JS type name, min, max)
+    ('B', 'uint8', 0, 0xFF),
+    ('H', 'uint16', 0, 0xFFFF),
+    ('I', 'uint32', 0, 0xFFFFFFFF),
+    ('i', 'int32', -0x80000000, 0x7FFFFFFF)
+]
+
+BUFFER_TYPES = [name for _, name, _, _ in INT_TYPES] + ['float32', 'float64', 'bits']
+
+# Every supported platform is little-endian; buffers are written as-is
+assert array('H', [1]).tobytes() == b'\x01\x00'
+
+
+class Packer:
+    """Collects packed lists into one buffer per type and hands out references"""
+    def __init__(self):
+        self.chunks = {name: [] for name in BUFFER_TYPES}
+        self.lengths = dict.fromkeys(BUFFER_TYPES, 0)
+
+    def add(self, type_name, data, count, shape):
+        ref = {'$': [BUFFER_TYPES.index(type_name), self.lengths[type_name], *shape]}
+        self.chunks[type_name].append(data)
+        self.lengths[type_name] += count
+        return ref
+
+    def pack_ints(self, values, shape):
+        low, high = min(values), max(values)
+        for typecode, name, type_min, type_max in INT_TYPES:
+            if type_min <= low and high <= type_max:
+                return self.add(name, array(typecode, values).tobytes(), len(values), shape)
+        # Beyond 32 bits; doubles keep exactly what JSON would
+        return self.add('float64', array('d', values).tobytes(), len(values), shape)
+
+    def pack_array(self, values):
+        if values.dtype.kind in 'iu':
+            return self.pack_ints(values.ravel().tolist(), values.shape)
+        flat = values.ravel()
+        if np.all((flat == 0) | (flat == 1)):
+            packed = np.packbits(flat.astype(bool))
+            return self.add('bits', packed.tobytes(), len(packed), values.shape)
+        single = flat.astype(np.float32)
+        if np.array_equal(single, flat):
+            return self.add('float32', single.tobytes(), flat.size, values.shape)
+        return self.add('float64', flat.astype(np.float64).tobytes(), flat.size, values.shape)
+
+    def pack(self, value):
+        if isinstance(value, dict):
+            return {key: self.pack(item) for key, item in value.items()}
+        if not isinstance(value, (list, tuple)):
+            return value
+        if len(value) >= MIN_PACKED_LENGTH or (value and isinstance(value[0], (list, tuple))):
+            first = value[0]
+            if type(first) is int:
+                try:
+                    return self.pack_ints(value, [len(value)])
+                except TypeError:
+                    pass  # Not all ints, try as an array
+            if isinstance(first, (int, float, list, tuple)) and not isinstance(first, bool):
+                try:
+                    values = np.asarray(value)
+                except ValueError:
+                    values = None  # Ragged
+                if values is not None and values.dtype.kind in 'iuf' and values.size >= MIN_PACKED_LENGTH:
+                    return self.pack_array(values)
+        return [self.pack(item) for item in value]
+
+
+def encode(payload):
+    """Binary encoding of a JSON-serializable payload"""
+    packer = Packer()
+    body = packer.pack(payload)
+
+    buffers = []
+    data = bytearray()
+    for name in BUFFER_TYPES:
+        data.extend(bytes(-len(data) % 8))
+        buffers.append({'type': name, 'offset': len(data), 'length': packer.lengths[name]})
+        for chunk in packer.chunks[name]:
+            data.extend(chunk)
+
+    header = json.dumps({'buffers': buffers, 'body': body}, separators=(',', ':')).encode()
+    prefix = MAGIC + struct.pack('<I', len(header)) + header
+    return b''.join([prefix, bytes(-len(prefix) % 8), data])
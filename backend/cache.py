@@ -0,0 +1,83 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# ============ RESPONSE CACHE ============
+
+class ResponseCache:
+    """
+    LRU cache of encoded response bodies, bounded by their total size in bytes.
+    A max_bytes of 0 disables the cache entirely.
+
+    Each entry can also hold compressed copies of its body, one per content
+    encoding ('gzip', 'br'); they count towards the size and are evicted with
+    the entry. Storing a new uncompressed body drops the old copies.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(endpoint, params):
+        """Stable hash of an endpoint name and its (JSON-serializable) parameters"""
+        payload = json.dumps([endpoint, params], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """Every stored encoding of the body under key, as {encoding: body}, or None"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            variants = self.entries.get(key)
+            if variants is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(variants)
+
+    def put(self, key, body, encoding='identity'):
+        if not self.enabled or len(body) > self.max_bytes:
+            return
+        with self.lock:
+            variants = self.entries.pop(key, None)
+            if variants is None or encoding == 'identity':
+                if variants is not None:
+                    self.size -= sum(len(old) for old in variants.values())
+                variants = {}
+            elif encoding in variants:
+                self.size -= len(variants[encoding])
+            variants[encoding] = body
+            self.entries[key] = variants
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= sum(len(old) for old in evicted.values())
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,109 @@
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+# ============ RESPONSE COMPRESSION ============
+# Traces are extremely repetitive (consecutive steps differ in an element or
+# two), so they compress by well over 10x. Bodies below MIN_BYTES are sent
+# as they are: compressing them saves next to nothing.
+
+MIN_BYTES = 1024
+
+# Fast settings: these run on every uncached response
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+
+# Streams are flushed at least this often so steps keep arriving promptly
+STREAM_FLUSH_SECONDS = 0.05
+
+# Preferred first when the client accepts several
+ENCODINGS = (['br'] if brotli else []) + ['gzip']
+
+
+def choose_encoding(accept_encodings, size):
+    """
+    Best encoding the client accepts (a werkzeug Accept object) for a body of
+    `size` bytes, or None to send it uncompressed. Streams pass size=None.
+    """
+    if size is not None and size < MIN_BYTES:
+        return None
+    for encoding in ENCODINGS:
+        if accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+class _Gzip:
+    def __init__(self):
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def process(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+COMPRESSORS = {
+    'gzip': _Gzip,
+    'br': _Brotli
+}
+
+
+def compress(body, encoding):
+    """Compress a whole body at once"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = COMPRESSORS[encoding]()
+    return compressor.process(body) + compressor.finish()
+
+
+def decompress(body, encoding):
+    if encoding == 'br':
+        return brotli.decompress(body)
+    return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+
+
+def compress_chunks(chunks, encoding):
+    """
+    Compress an iterable of str/bytes chunks incrementally, yielding
+    compressed data as it is produced. Only the compressor's window is held
+    in memory, never the whole body. Output is flushed after the first chunk
+    and then at least every STREAM_FLUSH_SECONDS, so a streamed trace still
+    reaches the client step by step.
+    """
+    compressor = COMPRESSORS[encoding]()
+    last_flush = None
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = compressor.process(chunk)
+        now = time.perf_counter()
+        if last_flush is None or now - last_flush >= STREAM_FLUSH_SECONDS:
+            data += compressor.flush()
+            last_flush = now
+        if data:
+            yield data
+    yield compressor.finish()
@@ -0,0 +1,321 @@
+import random
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from path_finding import MAX_TERRAIN_COST, Grid, generate_maze_array
+
+# ============ MAZE GENERATION ============
+# Seeded generators: the same (generator, rows, cols, seed, density,
+# connected) always gives the same maze, so clients can refer to one by
+# those fields instead of posting the grid. Mazes are uint8 arrays in
+# path_finding's TERRAIN format, and every generator runs in linear time.
+#
+# The structured generators work on a lattice: cells sit at even (row, col)
+# and the odd positions between two cells are the walls that get carved.
+# An even dimension has one spare last row/column, which repeats the one
+# before it so the bottom-right corner is a cell like the top-left one.
+# Their `density` is the chance that a wall between two open cells stays:
+# 1 keeps the perfect maze, lower values knock through walls to add loops.
+
+
+def _lattice_shape(rows, cols):
+    return rows - (rows % 2 == 0), cols - (cols % 2 == 0)
+
+def _extend(lattice, rows, cols):
+    """Pad a lattice maze to rows x cols by repeating its last row/column"""
+    grid = np.empty((rows, cols), dtype=np.uint8)
+    height, width = lattice.shape
+    grid[:height, :width] = lattice
+    if rows > height:
+        grid[height, :width] = lattice[-1]
+    if cols > width:
+        grid[:, width] = grid[:, width - 1]
+    return grid
+
+def _braid(lattice, rng, density):
+    """Remove each wall between two open cells with probability 1 - density"""
+    if density >= 1:
+        return
+    for walls, before, after in (
+        (lattice[0::2, 1::2], lattice[0::2, 0:-1:2], lattice[0::2, 2::2]),
+        (lattice[1::2, 0::2], lattice[0:-1:2, 0::2], lattice[2::2, 0::2])
+    ):
+        removable = (walls == 1) & (before == 0) & (after == 0)
+        walls[removable & (rng.random(walls.shape) >= density)] = 0
+
+def _cell_neighbors(i, j, height, width):
+    """Lattice neighbors of cell (i, j), in lattice coordinates"""
+    neighbors = []
+    if j + 1 < width:
+        neighbors.append((i, j + 1))
+    if i + 1 < height:
+        neighbors.append((i + 1, j))
+    if j > 0:
+        neighbors.append((i, j - 1))
+    if i > 0:
+        neighbors.append((i - 1, j))
+    return neighbors
+
+def noise(rows, cols, seed, density):
+    """Independent random walls, each cell a wall with probability `density`"""
+    return generate_maze_array(rows, cols, seed=seed, density=density)
+
+# Side of the square patches of equal cost laid by terrain()
+TERRAIN_PATCH = 4
+
+def terrain(rows, cols, seed, density):
+    """
+    Random walls like noise over patches of rough ground: TERRAIN_PATCH x
+    TERRAIN_PATCH blocks share a random cost from 1 to MAX_TERRAIN_COST
+    """
+    rng = np.random.default_rng(seed)
+    walls = rng.random((rows, cols)) < density
+    patches = rng.integers(1, MAX_TERRAIN_COST + 1, size=(rows // TERRAIN_PATCH + 1, cols // TERRAIN_PATCH + 1))
+    costs = patches.repeat(TERRAIN_PATCH, axis=0).repeat(TERRAIN_PATCH, axis=1)[:rows, :cols]
+    grid = np.where(costs == 1, 0, costs).astype(np.uint8)
+    grid[walls] = 1
+    return grid
+
+def backtracker(rows, cols, seed, density):
+    """Depth-first carving with an explicit stack: long, winding corridors"""
+    rng = random.Random(seed)
+    height, width = _lattice_shape(rows, cols)
+    cell_rows, cell_cols = (height + 1) // 2, (width + 1) // 2
+    grid = bytearray(b'\x01') * (height * width)
+    seen = bytearray(cell_rows * cell_cols)
+
+    seen[0] = 1
+    grid[0] = 0
+    stack = [(0, 0)]
+    while stack:
+        i, j = stack[-1]
+        options = [(ni, nj) for ni, nj in _cell_neighbors(i, j, cell_rows, cell_cols)
+                   if not seen[ni * cell_cols + nj]]
+        if not options:
+            stack.pop()
+            continue
+        ni, nj = rng.choice(options)
+        seen[ni * cell_cols + nj] = 1
+        grid[(i + ni) * width + (j + nj)] = 0
+        grid[2 * ni * width + 2 * nj] = 0
+        stack.append((ni, nj))
+
+    lattice = np.frombuffer(grid, dtype=np.uint8).reshape(height, width).copy()
+    _braid(lattice, np.random.default_rng(seed), density)
+    return _extend(lattice, rows, cols)
+
+def prim(rows, cols, seed, density):
+    """Randomized Prim's: grows from a random frontier cell, short branching dead ends"""
+    rng = random.Random(seed)
+    height, width = _lattice_shape(rows, cols)
+    cell_rows, cell_cols = (height + 1) // 2, (width + 1) // 2
+    grid = bytearray(b'\x01') * (height * width)
+    state = bytearray(cell_rows * cell_cols)  # 0 = untouched, 1 = frontier, 2 = carved
+
+    def add_frontier(i, j):
+        for ni, nj in _cell_neighbors(i, j, cell_rows, cell_cols):
+            if not state[ni * cell_cols + nj]:
+                state[ni * cell_cols + nj] = 1
+                frontier.append((ni, nj))
+
+    frontier = []
+    state[0] = 2
+    grid[0] = 0
+    add_frontier(0, 0)
+    while frontier:
+        k = rng.randrange(len(frontier))
+        frontier[k], frontier[-1] = frontier[-1], frontier[k]
+        i, j = frontier.pop()
+        carved = [(ni, nj) for ni, nj in _cell_neighbors(i, j, cell_rows, cell_cols)
+                  if state[ni * cell_cols + nj] == 2]
+        ni, nj = rng.choice(carved)
+        state[i * cell_cols + j] = 2
+        grid[(i + ni) * width + (j + nj)] = 0
+        grid[2 * i * width + 2 * j] = 0
+        add_frontier(i, j)
+
+    lattice = np.frombuffer(grid, dtype=np.uint8).reshape(height, width).copy()
+    _braid(lattice, np.random.default_rng(seed), density)
+    return _extend(lattice, rows, cols)
+
+def division(rows, cols, seed, density):
+    """
+    Recursive division: splits open chambers with a wall that has one gap,
+    giving long straight walls. Chambers are kept on a stack; every wall cell
+    is drawn once, so the work stays linear.
+    """
+    rng = random.Random(seed)
+    height, width = _lattice_shape(rows, cols)
+    lattice = np.zeros((height, width), dtype=np.uint8)
+
+    chambers = [(0, height - 1, 0, width - 1)]
+    while chambers:
+        r0, r1, c0, c1 = chambers.pop()
+        cell_rows, cell_cols = (r1 - r0) // 2 + 1, (c1 - c0) // 2 + 1
+        if cell_rows < 2 and cell_cols < 2:
+            continue
+        horizontal = cell_rows > cell_cols or (cell_rows == cell_cols and rng.random() < 0.5)
+        if horizontal:
+            r = r0 + 2 * rng.randrange(cell_rows - 1) + 1
+            lattice[r, c0:c1 + 1] = 1
+            lattice[r, c0 + 2 * rng.randrange(cell_cols)] = 0
+            chambers += [(r0, r - 1, c0, c1), (r + 1, r1, c0, c1)]
+        else:
+            c = c0 + 2 * rng.randrange(cell_cols - 1) + 1
+            lattice[r0:r1 + 1, c] = 1
+            lattice[r0 + 2 * rng.randrange(cell_rows), c] = 0
+            chambers += [(r0, r1, c0, c - 1), (r0, r1, c + 1, c1)]
+
+    _braid(lattice, np.random.default_rng(seed), density)
+    return _extend(lattice, rows, cols)
+
+
+# name -> (function, default density)
+GENERATORS = {
+    'noise': (noise, 0.3),
+    'terrain': (terrain, 0.1),
+    'backtracker': (backtracker, 1.0),
+    'prim': (prim, 1.0),
+    'division': (division, 1.0)
+}
+
+
+def connect(grid):
+    """
+    Open the two corners and carve the fewest walls needed to join every
+    open region to the top-left one, in place. A 0-1 BFS from that corner
+    (open cells cost 0 to enter, walls 1) gives each cell a cheapest route
+    back to it; each other region opens the walls on its route, stopping at
+    the first cell already joined.
+    """
+    rows, cols = grid.shape
+    n = rows * cols
+    for r, c in ((0, 0), (rows - 1, cols - 1)):
+        if grid[r, c] == 1:
+            grid[r, c] = 0
+    cells = bytearray((grid == 1).tobytes())  # 1 = wall
+
+    def neighbors(idx):
+        r, c = divmod(idx, cols)
+        if c + 1 < cols:
+            yield idx + 1
+        if r + 1 < rows:
+            yield idx + cols
+        if c > 0:
+            yield idx - 1
+        if r > 0:
+            yield idx - cols
+
+    # Label the open regions
+    labels = array('i', [-1]) * n
+    regions = []  # One cell of each region
+    for idx in range(n):
+        if cells[idx] or labels[idx] >= 0:
+            continue
+        label = len(regions)
+        regions.append(idx)
+        labels[idx] = label
+        queue = deque([idx])
+        while queue:
+            for nidx in neighbors(queue.popleft()):
+                if not cells[nidx] and labels[nidx] < 0:
+                    labels[nidx] = label
+                    queue.append(nidx)
+    if len(regions) < 2:
+        return grid
+
+    dist = array('i', [-1]) * n
+    parent = array('i', [-1]) * n
+    dist[0] = 0
+    queue = deque([0])
+    while queue:
+        idx = queue.popleft()
+        for nidx in neighbors(idx):
+            new_dist = dist[idx] + cells[nidx]
+            if dist[nidx] < 0 or new_dist < dist[nidx]:
+                dist[nidx] = new_dist
+                parent[nidx] = idx
+                if cells[nidx]:
+                    queue.append(nidx)
+                else:
+                    queue.appendleft(nidx)
+
+    joined = bytearray(len(regions))  # by label
+    joined[labels[0]] = 1
+    for label, idx in enumerate(regions):
+        if joined[label]:
+            continue
+        crossed = [label]
+        while cells[idx] or not joined[labels[idx]]:
+            if cells[idx]:
+                cells[idx] = 0
+                labels[idx] = labels[0]
+            else:
+                crossed.append(labels[idx])
+            idx = parent[idx]
+        for region in crossed:
+            joined[region] = 1
+
+    walls = np.frombuffer(bytes(cells), dtype=np.uint8).reshape(rows, cols)
+    grid[(grid == 1) & (walls == 0)] = 0
+    return grid
+
+
+def generate(generator, rows, cols, seed=None, density=None, connected=False):
+    """A maze from one of GENERATORS; `density` defaults to the generator's own"""
+    func, default_density = GENERATORS[generator]
+    grid = func(rows, cols, seed, default_density if density is None else density)
+    if connected:
+        connect(grid)
+    return grid
+
+
+# ============ MAZE CACHE ============
+
+class MazeCache:
+    """
+    LRU cache of generated mazes, bounded by their total size in bytes.
+    Mazes come back as immutable path_finding.Grid objects, shared by every
+    caller and worker without copying.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, generator, rows, cols, seed, density=None, connected=False):
+        key = (generator, rows, cols, seed, density, bool(connected))
+        with self.lock:
+            grid = self.entries.get(key)
+            if grid is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return grid
+            self.misses += 1
+
+        grid = Grid.from_array(generate(generator, rows, cols, seed, density, connected))
+        if grid.nbytes <= self.max_bytes:
+            with self.lock:
+                if key not in self.entries:
+                    self.entries[key] = grid
+                    self.size += grid.nbytes
+                while self.size > self.max_bytes:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.size -= evicted.nbytes
+        return grid
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,218 @@
+import base64
+import math
+import time
+
+import numpy as np
+
+# ============ SHARED ML HELPERS ============
+# Everything the torch (ML.py) and NumPy (ml_numpy.py) backends have in
+# common: the datasets, the training schedule and the payload encoding. Kept
+# free of torch so the app and NumPy-only workers never have to import it.
+
+def generate_classification_data(problem_type, n_samples=200):
+    """Generate classification datasets"""
+    np.random.seed(42)
+    
+    if problem_type == 'linear':
+        # Linearly separable data - two Gaussian clusters
+        X1 = np.random.randn(n_samples // 2, 2) * 0.8 + np.array([2, 2])
+        X2 = np.random.randn(n_samples // 2, 2) * 0.8 + np.array([-2, -2])
+        X = np.vstack([X1, X2])
+        y = np.hstack([np.zeros(n_samples // 2), np.ones(n_samples // 2)])
+        
+    elif problem_type == 'xor':
+        # XOR pattern - requires hidden layers
+        n_per_class = n_samples // 4
+        X1 = np.random.randn(n_per_class, 2) * 0.5 + np.array([1.5, 1.5])
+        X2 = np.random.randn(n_per_class, 2) * 0.5 + np.array([-1.5, -1.5])
+        X3 = np.random.randn(n_per_class, 2) * 0.5 + np.array([1.5, -1.5])
+        X4 = np.random.randn(n_per_class, 2) * 0.5 + np.array([-1.5, 1.5])
+        X = np.vstack([X1, X2, X3, X4])
+        y = np.hstack([np.zeros(n_per_class), np.zeros(n_per_class), 
+                       np.ones(n_per_class), np.ones(n_per_class)])
+        
+    elif problem_type == 'circle':
+        # Concentric circles - inner circle is class 0, outer is class 1
+        n_per_class = n_samples // 2
+        
+        # Inner circle
+        theta1 = np.random.uniform(0, 2 * np.pi, n_per_class)
+        r1 = np.random.uniform(0, 1.5, n_per_class)
+        X1 = np.column_stack([r1 * np.cos(theta1), r1 * np.sin(theta1)])
+        
+        # Outer circle
+        theta2 = np.random.uniform(0, 2 * np.pi, n_per_class)
+        r2 = np.random.uniform(2.5, 4, n_per_class)
+        X2 = np.column_stack([r2 * np.cos(theta2), r2 * np.sin(theta2)])
+        
+        X = np.vstack([X1, X2])
+        y = np.hstack([np.zeros(n_per_class), np.ones(n_per_class)])
+    
+    # Shuffle the data
+    indices = np.random.permutation(len(X))
+    X = X[indices]
+    y = y[indices]
+    
+    return X.tolist(), y.tolist()
+
+
+# Upper bound on elements in one batched boundary evaluation (~16 MB of floats)
+BOUNDARY_BATCH_ELEMENTS = 4 * 1024 * 1024
+
+
+def boundary_bounds(X):
+    """[min_x, max_x, min_y, max_y] of the boundary grid: the data range padded by 1, as drawn by the frontend"""
+    X = np.asarray(X)
+    min_x, min_y = X.min(axis=0) - 1
+    max_x, max_y = X.max(axis=0) + 1
+    return [float(min_x), float(max_x), float(min_y), float(max_y)]
+
+
+def boundary_grid(X, resolution):
+    """
+    Bounds (see boundary_bounds) and the resolution x resolution evaluation
+    points, row-major with y as the row.
+    """
+    bounds = boundary_bounds(X)
+    min_x, max_x, min_y, max_y = bounds
+    xs = min_x + np.arange(resolution) * (max_x - min_x) / resolution
+    ys = min_y + np.arange(resolution) * (max_y - min_y) / resolution
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    points = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+    return bounds, points
+
+
+def encode_heatmaps(probs):
+    """[k, points] probabilities -> one base64 string of uint8 levels per row"""
+    quantized = np.round(probs * 255).astype(np.uint8)
+    return [base64.b64encode(row.tobytes()).decode() for row in quantized]
+
+
+class TrainingSchedule:
+    """
+    Decides, epoch by epoch, whether to record a snapshot and whether to stop.
+
+    By default a snapshot is taken every `snapshot_interval` epochs and on the
+    last epoch, and training stops once a snapshot shows perfect accuracy.
+    Optionally it also stops when:
+      - the loss has not improved by more than `min_delta` for `patience` epochs
+      - `time_budget` seconds of training have passed
+    With a `snapshot_delta`, snapshots become adaptive: one is taken once the
+    loss has moved by that fraction since the previous snapshot, or after
+    `max_snapshot_interval` epochs without one, and never closer than
+    `snapshot_interval` epochs apart. Steep stretches of the loss curve get
+    dense snapshots, flat ones sparse.
+    The epoch training stops at is always recorded. `stop_reason` ends up as
+    'converged', 'plateau', 'time_budget' or 'max_epochs'.
+    """
+    def __init__(self, max_epochs, snapshot_interval=10, patience=None, min_delta=0.0, time_budget=None,
+                 snapshot_delta=None, max_snapshot_interval=100):
+        self.max_epochs = max_epochs
+        self.snapshot_interval = max(1, int(snapshot_interval))
+        self.patience = patience
+        self.min_delta = min_delta
+        self.deadline = time.perf_counter() + time_budget if time_budget else None
+        self.snapshot_delta = snapshot_delta
+        self.max_snapshot_interval = max(self.snapshot_interval, int(max_snapshot_interval))
+        self.best_loss = math.inf
+        self.stale_epochs = 0
+        self.last_epoch = None
+        self.last_loss = None
+        self.stop_reason = None
+
+    @property
+    def capacity(self):
+        """Most snapshots a run can record: snapshots are at least snapshot_interval apart, plus the last one"""
+        return (self.max_epochs - 1) // self.snapshot_interval + 2
+
+    @property
+    def needs_loss(self):
+        """Whether check() needs the loss value of every epoch"""
+        return bool(self.patience) or bool(self.snapshot_delta)
+
+    def check(self, epoch, loss=None):
+        """Called after every epoch's update. Returns whether to record a snapshot"""
+        if self.patience:
+            if loss < self.best_loss - self.min_delta:
+                self.best_loss = loss
+                self.stale_epochs = 0
+            else:
+                self.stale_epochs += 1
+                if self.stale_epochs >= self.patience:
+                    self.stop_reason = 'plateau'
+        if self.deadline and time.perf_counter() > self.deadline:
+            self.stop_reason = 'time_budget'
+        if epoch == self.max_epochs - 1 and not self.stop_reason:
+            self.stop_reason = 'max_epochs'
+        if self.stop_reason:
+            return True
+
+        if not self.snapshot_delta:
+            return epoch % self.snapshot_interval == 0
+        if self.last_epoch is None:
+            return True
+        gap = epoch - self.last_epoch
+        if gap < self.snapshot_interval:
+            return False
+        return (gap >= self.max_snapshot_interval
+                or abs(loss - self.last_loss) >= self.snapshot_delta * abs(self.last_loss))
+
+    def recorded(self, epoch, loss, converged):
+        """Called after a snapshot is recorded"""
+        self.last_epoch = epoch
+        self.last_loss = loss
+        if converged:
+            self.stop_reason = 'converged'
+
+    @property
+    def done(self):
+        return self.stop_reason is not None
+
+    def summary(self, epochs_run):
+        return {'stop_reason': self.stop_reason, 'epochs_run': epochs_run}
+
+
+def pack_snapshots(epochs, losses, accuracies, predictions, weights, columnar=False, boundaries=None):
+    """
+    Turn per-snapshot arrays (one row per snapshot; `weights` maps parameter
+    names to [snapshots, *shape] arrays) into the /api/ml-train payload:
+    a list of per-snapshot dicts, or with columnar=True one dict of columns
+    with predictions packed as bits.
+    """
+    weights = {name: history.tolist() for name, history in weights.items()}
+
+    if columnar:
+        packed = np.packbits(predictions, axis=1)
+        snapshots = {
+            'epochs': epochs.tolist(),
+            'loss': losses.tolist(),
+            'accuracy': accuracies.tolist(),
+            'predictions': {
+                'n_samples': predictions.shape[1],
+                'packed': [base64.b64encode(row.tobytes()).decode() for row in packed]
+            },
+            'weights': weights
+        }
+        if boundaries is not None:
+            snapshots['boundaries'] = boundaries
+        return snapshots
+
+    steps = [
+        {
+            'epoch': epoch,
+            'loss': loss,
+            'accuracy': accuracy,
+            'predictions': prediction,
+            'weights': {name: history[i] for name, history in weights.items()}
+        }
+        for i, (epoch, loss, accuracy, prediction) in enumerate(zip(
+            epochs.tolist(),
+            losses.tolist(),
+            accuracies.tolist(),
+            predictions.astype(np.float32).tolist()
+        ))
+    ]
+    if boundaries is not None:
+        for step, boundary in zip(steps, boundaries):
+            step['boundary'] = boundary
+    return steps
@@ -0,0 +1,206 @@
+import math
+
+import numpy as np
+
+from ml_common import BOUNDARY_BATCH_ELEMENTS, TrainingSchedule, boundary_grid, encode_heatmaps, pack_snapshots
+
+# ============ NUMPY ML BACKEND ============
+# The same models, BCE loss and Adam updates as ML.py, written directly in
+# NumPy (float32 throughout). For 2 -> 16 -> 1 networks on a few hundred
+# points torch spends most of each epoch on per-op dispatch, which this
+# avoids, and this module works without torch installed. Weight names match
+# the torch state_dict keys so snapshots have the same shape either way.
+
+
+def _sigmoid(z):
+    with np.errstate(over='ignore'):
+        return 1 / (1 + np.exp(-z))
+
+
+def _linear_init(rng, in_features, out_features):
+    """Same distribution as torch.nn.Linear's default init: U(-1/sqrt(fan_in), 1/sqrt(fan_in))"""
+    bound = 1 / math.sqrt(in_features)
+    weight = rng.uniform(-bound, bound, (out_features, in_features)).astype(np.float32)
+    bias = rng.uniform(-bound, bound, (out_features,)).astype(np.float32)
+    return weight, bias
+
+
+class LinearClassifier:
+    """NumPy twin of ML.LinearClassifier"""
+    def __init__(self, rng):
+        weight, bias = _linear_init(rng, 2, 1)
+        self.params = {'linear.weight': weight, 'linear.bias': bias}
+
+    def forward(self, x):
+        self.x = x
+        return _sigmoid(x @ self.params['linear.weight'].T + self.params['linear.bias'])
+
+    def backward(self, grad_z):
+        return {
+            'linear.weight': grad_z.T @ self.x,
+            'linear.bias': grad_z.sum(axis=0)
+        }
+
+    @staticmethod
+    def forward_stacked(x, weights):
+        """Evaluate k weight snapshots at once: x [n, 2] -> [k, n, 1]"""
+        w, b = weights['linear.weight'], weights['linear.bias']
+        return _sigmoid(np.matmul(x, w.transpose(0, 2, 1)) + b[:, None, :])
+
+
+class MLPClassifier:
+    """NumPy twin of ML.MLPClassifier"""
+    def __init__(self, rng, hidden_size=8):
+        w1, b1 = _linear_init(rng, 2, hidden_size)
+        w2, b2 = _linear_init(rng, hidden_size, 1)
+        self.params = {'fc1.weight': w1, 'fc1.bias': b1, 'fc2.weight': w2, 'fc2.bias': b2}
+
+    def forward(self, x):
+        self.x = x
+        self.hidden_in = x @ self.params['fc1.weight'].T + self.params['fc1.bias']
+        self.hidden = np.maximum(self.hidden_in, 0)
+        return _sigmoid(self.hidden @ self.params['fc2.weight'].T + self.params['fc2.bias'])
+
+    def backward(self, grad_z):
+        grad_hidden = (grad_z @ self.params['fc2.weight']) * (self.hidden_in > 0)
+        return {
+            'fc1.weight': grad_hidden.T @ self.x,
+            'fc1.bias': grad_hidden.sum(axis=0),
+            'fc2.weight': grad_z.T @ self.hidden,
+            'fc2.bias': grad_z.sum(axis=0)
+        }
+
+    @staticmethod
+    def forward_stacked(x, weights):
+        """Evaluate k weight snapshots at once: x [n, 2] -> [k, n, 1]"""
+        w1, b1 = weights['fc1.weight'], weights['fc1.bias']
+        w2, b2 = weights['fc2.weight'], weights['fc2.bias']
+        hidden = np.maximum(np.matmul(x, w1.transpose(0, 2, 1)) + b1[:, None, :], 0)
+        return _sigmoid(np.matmul(hidden, w2.transpose(0, 2, 1)) + b2[:, None, :])
+
+
+def bce_loss(outputs, targets):
+    """
+    torch.nn.BCELoss (mean reduction, logs clamped at -100) and its gradient
+    with respect to the pre-sigmoid logits
+    """
+    with np.errstate(divide='ignore'):
+        log_p = np.maximum(np.log(outputs), -100)
+        log_not_p = np.maximum(np.log(1 - outputs), -100)
+    loss = -np.mean(targets * log_p + (1 - targets) * log_not_p)
+
+    # BCELoss backward followed by sigmoid backward, as autograd chains them
+    grad_outputs = (outputs - targets) / np.maximum((1 - outputs) * outputs, 1e-12) / len(outputs)
+    return loss, grad_outputs * outputs * (1 - outputs)
+
+
+class Adam:
+    """torch.optim.Adam with its defaults (betas 0.9/0.999, eps 1e-8), updating params in place"""
+    def __init__(self, params, lr, betas=(0.9, 0.999), eps=1e-8):
+        self.params = params
+        self.lr = lr
+        self.beta1, self.beta2 = betas
+        self.eps = eps
+        self.t = 0
+        self.exp_avg = {name: np.zeros_like(param) for name, param in params.items()}
+        self.exp_avg_sq = {name: np.zeros_like(param) for name, param in params.items()}
+
+    def step(self, grads):
+        self.t += 1
+        bias_correction1 = 1 - self.beta1 ** self.t
+        bias_correction2_sqrt = math.sqrt(1 - self.beta2 ** self.t)
+        step_size = self.lr / bias_correction1
+
+        for name, param in self.params.items():
+            grad = grads[name]
+            exp_avg, exp_avg_sq = self.exp_avg[name], self.exp_avg_sq[name]
+            exp_avg += (grad - exp_avg) * (1 - self.beta1)
+            exp_avg_sq *= self.beta2
+            exp_avg_sq += (1 - self.beta2) * grad * grad
+            denom = np.sqrt(exp_avg_sq) / bias_correction2_sqrt + self.eps
+            param -= step_size * exp_avg / denom
+
+
+def decision_boundaries(model, stacked_weights, X, resolution=50):
+    """Same as ML.decision_boundaries, with NumPy batched matmuls"""
+    _, points = boundary_grid(X, resolution)
+    points = points.astype(np.float32)
+    count = next(iter(stacked_weights.values())).shape[0]
+    width = max(param.shape[0] for param in model.params.values())
+    chunk = max(1, BOUNDARY_BATCH_ELEMENTS // (len(points) * width))
+
+    encoded = []
+    for lo in range(0, count, chunk):
+        weights = {name: history[lo:lo + chunk] for name, history in stacked_weights.items()}
+        encoded.extend(encode_heatmaps(model.forward_stacked(points, weights)[:, :, 0]))
+    return encoded
+
+
+def train_neural_network(X, y, problem_type, max_epochs=10000, snapshot_interval=10, columnar=False,
+                         boundary_resolution=None, summary=None, seed=None, init_weights=None, **stopping):
+    """
+    NumPy version of ML.train_neural_network, returning snapshots of the same
+    shape. `init_weights` (parameter name -> array) overrides the random
+    initialization, e.g. to start from the same weights as a torch model.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32).reshape(-1, 1)
+    rng = np.random.default_rng(seed)
+
+    # Choose model based on problem type
+    if problem_type == 'linear':
+        model = LinearClassifier(rng)
+        learning_rate = 0.1
+    else:  # xor or circle
+        model = MLPClassifier(rng, hidden_size=16)
+        learning_rate = 0.01
+
+    if init_weights:
+        for name, value in init_weights.items():
+            model.params[name][...] = value
+
+    optimizer = Adam(model.params, lr=learning_rate)
+
+    schedule = TrainingSchedule(max_epochs, snapshot_interval, **stopping)
+    n_snapshots = schedule.capacity
+
+    epochs = np.empty(n_snapshots, dtype=np.int64)
+    losses = np.empty(n_snapshots, dtype=np.float32)
+    accuracies = np.empty(n_snapshots, dtype=np.float32)
+    predictions = np.empty((n_snapshots, len(X)), dtype=bool)
+    history = {
+        name: np.empty((n_snapshots, *param.shape), dtype=np.float32)
+        for name, param in model.params.items()
+    }
+    count = 0
+
+    for epoch in range(max_epochs):
+        outputs = model.forward(X)
+        loss, grad_z = bce_loss(outputs, y)
+        optimizer.step(model.backward(grad_z))
+
+        if schedule.check(epoch, float(loss)):
+            correct = np.round(outputs) == y
+
+            epochs[count] = epoch
+            losses[count] = loss
+            accuracies[count] = correct.mean(dtype=np.float32)
+            predictions[count] = outputs[:, 0] > 0.5
+            for name, param in model.params.items():
+                history[name][count] = param
+            count += 1
+            schedule.recorded(epoch, float(loss), correct.all())
+
+        if schedule.done:
+            break
+
+    if summary is not None:
+        summary.update(schedule.summary(epoch + 1))
+
+    stacked = {name: values[:count] for name, values in history.items()}
+    boundaries = None
+    if boundary_resolution:
+        boundaries = decision_boundaries(model, stacked, X, boundary_resolution)
+
+    return pack_snapshots(epochs[:count], losses[:count], accuracies[:count], predictions[:count],
+                          stacked, columnar, boundaries)
@@ -1,7 +1,117 @@
+import heapq
 import random
+from array import array
 from collections import deque
+from itertools import chain
+
+import numpy as np
+
+# ============ STEP TRACES ============
+
+class FullTrace:
+    """
+    Records every step with the full list of visited cells. Steps of
+    bidirectional searches also carry 'side', the search ('start' or 'end')
+    that expanded 'current'; cells pushed by an expansion belong to its side.
+    """
+    def __init__(self, visited):
+        self.visited = visited
+
+    def push(self, cell):
+        pass
+
+    def step(self, current, path=None, side=None):
+        step = {
+            'visited': list(self.visited),
+            'current': list(current),
+            'path': path or []
+        }
+        if side is not None:
+            step['side'] = side
+        if path is not None:
+            step['complete'] = True
+        return step
+
+
+class DeltaTrace:
+    """
+    Records only what changed at each step:
+      - 'current': the cell expanded by this step, which joins the visited set
+      - 'frontier_add': cells pushed onto the frontier since the previous step
+        (the frontier starts as the start cell; visited cells leave it)
+      - 'side' for bidirectional searches, see FullTrace
+      - 'path' and 'complete' on the final step only
+    With a positive `keyframe_interval`, every n-th step (starting with the
+    first) also carries 'keyframe' and the full 'visited' list.
+    """
+    def __init__(self, visited, keyframe_interval=0):
+        self.visited = visited
+        self.keyframe_interval = max(0, int(keyframe_interval))
+        self.pending_frontier = []
+        self.count = 0
+
+    def push(self, cell):
+        self.pending_frontier.append(list(cell))
+
+    def step(self, current, path=None, side=None):
+        step = {'current': list(current)}
+        if side is not None:
+            step['side'] = side
+        if self.pending_frontier:
+            step['frontier_add'] = self.pending_frontier
+            self.pending_frontier = []
+        if path is not None:
+            step['path'] = path
+            step['complete'] = True
+        if self.keyframe_interval and self.count % self.keyframe_interval == 0:
+            step['keyframe'] = True
+            step['visited'] = list(self.visited)
+        self.count += 1
+        return step
+
+
+TRACE_FORMATS = {
+    'full': FullTrace,
+    'delta': DeltaTrace
+}
+
+
+def new_trace(visited, trace_format='full', **options):
+    trace_cls = TRACE_FORMATS.get(trace_format)
+    if not trace_cls:
+        raise ValueError(f"Unknown trace format: {trace_format}")
+    return trace_cls(visited, **options)
+
+
+def expand_delta(steps):
+    """
+    Turn delta steps back into full steps. The first step must be a keyframe;
+    visited cells are listed in the order they were expanded.
+    """
+    visited = {}
+    for step in steps:
+        if step.get('keyframe'):
+            visited = dict.fromkeys(tuple(cell) for cell in step['visited'])
+        else:
+            visited[tuple(step['current'])] = None
+        full = {
+            'visited': [list(cell) for cell in visited],
+            'current': step['current'],
+            'path': step.get('path') or []
+        }
+        if 'side' in step:
+            full['side'] = step['side']
+        if step.get('complete'):
+            full['complete'] = True
+        yield full
+
 
 # ============ PATHFINDING ALGORITHMS ============
+# TERRAIN: maze cells are 0 (open), 1 (wall) or 2..MAX_TERRAIN_COST, open
+# ground that costs that much to enter (0 costs 1). Dijkstra and A* weigh
+# moves by it; the other searches count every open cell as one step.
+
+MAX_TERRAIN_COST = 9
 
 def generate_maze(rows, cols):
     maze = [[0 for _ in range(cols)] for _ in range(rows)]
@@ -14,145 +124,33 @@ def generate_maze(rows, cols):
     
     return maze
 
-def dijkstra(maze, start, end):
-    steps = []
-    rows, cols = len(maze), len(maze[0])
-    
-    # Ensure start and end are not walls
-    maze[start[0]][start[1]] = 0
-    maze[end[0]][end[1]] = 0
-    
-    visited = set()
-    distances = {(start[0], start[1]): 0}
-    parent = {}
-    unvisited = [(0, start[0], start[1])]
-    
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-    
-    while unvisited:
-        unvisited.sort()
-        dist, r, c = unvisited.pop(0)
-        
-        if (r, c) in visited:
-            continue
-        
-        visited.add((r, c))
-        
-        steps.append({
-            'visited': list(visited),
-            'current': [r, c],
-            'path': []
-        })
-        
-        if r == end[0] and c == end[1]:
-            # Reconstruct path
-            path = []
-            curr = (r, c)
-            while curr in parent:
-                path.append(list(curr))
-                curr = parent[curr]
-            path.append(list(start))
-            path.reverse()
-            
-            steps.append({
-                'visited': list(visited),
-                'current': [r, c],
-                'path': path,
-                'complete': True
-            })
-            break
-        
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            
-            if (0 <= nr < rows and 0 <= nc < cols and 
-                maze[nr][nc] == 0 and (nr, nc) not in visited):
-                
-                new_dist = dist + 1
-                
-                if (nr, nc) not in distances or new_dist < distances[(nr, nc)]:
-                    distances[(nr, nc)] = new_dist
-                    parent[(nr, nc)] = (r, c)
-                    unvisited.append((new_dist, nr, nc))
-    
-    return steps
+def dijkstra_steps(maze, start, end, trace_format='full', diagonal=False, **trace_options):
+    """
+    Dijkstra on terrain costs with a bucket queue (see _dial_search).
+    With `diagonal`, moves go to all 8 neighbors.
+    """
+    rows, cols = _shape(maze)
+    return _dial_search(_maze_costs(maze, start, end), rows, cols, start, end, diagonal, False,
+                        trace_format, trace_options, set())
 
-def a_star(maze, start, end):
-    steps = []
-    rows, cols = len(maze), len(maze[0])
-    
-    maze[start[0]][start[1]] = 0
-    maze[end[0]][end[1]] = 0
-    
-    def heuristic(a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-    
-    visited = set()
-    g_score = {(start[0], start[1]): 0}
-    f_score = {(start[0], start[1]): heuristic(start, end)}
-    parent = {}
-    open_set = [(f_score[(start[0], start[1])], start[0], start[1])]
-    
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-    
-    while open_set:
-        open_set.sort()
-        _, r, c = open_set.pop(0)
-        
-        if (r, c) in visited:
-            continue
-        
-        visited.add((r, c))
-        
-        steps.append({
-            'visited': list(visited),
-            'current': [r, c],
-            'path': []
-        })
-        
-        if r == end[0] and c == end[1]:
-            path = []
-            curr = (r, c)
-            while curr in parent:
-                path.append(list(curr))
-                curr = parent[curr]
-            path.append(list(start))
-            path.reverse()
-            
-            steps.append({
-                'visited': list(visited),
-                'current': [r, c],
-                'path': path,
-                'complete': True
-            })
-            break
-        
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            
-            if (0 <= nr < rows and 0 <= nc < cols and 
-                maze[nr][nc] == 0 and (nr, nc) not in visited):
-                
-                tentative_g = g_score[(r, c)] + 1
-                
-                if (nr, nc) not in g_score or tentative_g < g_score[(nr, nc)]:
-                    parent[(nr, nc)] = (r, c)
-                    g_score[(nr, nc)] = tentative_g
-                    f_score[(nr, nc)] = tentative_g + heuristic([nr, nc], end)
-                    open_set.append((f_score[(nr, nc)], nr, nc))
-    
-    return steps
+def a_star_steps(maze, start, end, trace_format='full', diagonal=False, **trace_options):
+    """
+    A* on terrain costs with a bucket queue (see _dial_search), guided by
+    Manhattan distance, or octile distance with `diagonal`.
+    """
+    rows, cols = _shape(maze)
+    return _dial_search(_maze_costs(maze, start, end), rows, cols, start, end, diagonal, True,
+                        trace_format, trace_options, set())
 
-def bfs(maze, start, end):
-    steps = []
-    rows, cols = len(maze), len(maze[0])
-    
-    maze[start[0]][start[1]] = 0
-    maze[end[0]][end[1]] = 0
+def bfs_steps(maze, start, end, trace_format='full', **trace_options):
+    rows, cols = _shape(maze)
+    passable = _maze_passable(maze, start, end)
     
     visited = set()
+    trace = new_trace(visited, trace_format, **trace_options)
     parent = {}
     queue = deque([start])
+    queued = {tuple(start)}  # every cell ever enqueued; popped ones are also in visited
     
     directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
     
@@ -163,11 +161,7 @@ def bfs(maze, start, end):
             continue
         
         visited.add((r, c))
-        steps.append({
-            'visited': list(visited),
-            'current': [r, c],
-            'path': []
-        })
+        yield trace.step((r, c))
         
         if (r, c) == end:
             # Reconstruct path
@@ -179,34 +173,28 @@ def bfs(maze, start, end):
             path.append(list(start))
             path.reverse()
             
-            steps.append({
-                'visited': list(visited),
-                'current': [r, c],
-                'path': path,
-                'complete': True
-            })
+            yield trace.step((r, c), path)
             break
         
         for dr, dc in directions:
             nr, nc = r + dr, c + dc
             if (0 <= nr < rows and 0 <= nc < cols and
-                maze[nr][nc] == 0 and (nr, nc) not in visited):
-                if (nr, nc) not in queue:
+                passable[nr * cols + nc] and (nr, nc) not in visited):
+                if (nr, nc) not in queued:
                     parent[(nr, nc)] = (r, c)
                     queue.append((nr, nc))
+                    queued.add((nr, nc))
+                    trace.push((nr, nc))
     
-    return steps
 
 
 # ============ DFS ============
-def dfs(maze, start, end):
-    steps = []
-    rows, cols = len(maze), len(maze[0])
-
-    maze[start[0]][start[1]] = 0
-    maze[end[0]][end[1]] = 0
+def dfs_steps(maze, start, end, trace_format='full', **trace_options):
+    rows, cols = _shape(maze)
+    passable = _maze_passable(maze, start, end)
 
     visited = set()
+    trace = new_trace(visited, trace_format, **trace_options)
     parent = {}
     stack = [start]
     pushed = set([tuple(start)])  # track what’s already on stack
@@ -217,11 +205,7 @@ def dfs(maze, start, end):
         r, c = stack.pop()
 
         visited.add((r, c))
-        steps.append({
-            'visited': list(visited),
-            'current': [r, c],
-            'path': []
-        })
+        yield trace.step((r, c))
 
         if (r, c) == end:
             # Reconstruct path
@@ -233,21 +217,615 @@ def dfs(maze, start, end):
             path.append(list(start))
             path.reverse()
 
-            steps.append({
-                'visited': list(visited),
-                'current': [r, c],
-                'path': path,
-                'complete': True
-            })
+            yield trace.step((r, c), path)
             break
 
         # Push neighbors in **reverse order** for DFS
         for dr, dc in directions[::-1]:
             nr, nc = r + dr, c + dc
             if (0 <= nr < rows and 0 <= nc < cols and
-                maze[nr][nc] == 0 and (nr, nc) not in visited and (nr, nc) not in pushed):
+                passable[nr * cols + nc] and (nr, nc) not in visited and (nr, nc) not in pushed):
                 parent[(nr, nc)] = (r, c)
                 stack.append((nr, nc))
                 pushed.add((nr, nc))
+                trace.push((nr, nc))
+
+
+# ============ ARRAY ENGINE ============
+# Same searches on a NumPy uint8 grid or a Grid (see TERRAIN). Search state
+# lives in flat arrays indexed by r * cols + c instead of dicts keyed by
+# tuples. Neither engine ever writes to its maze: start and end count as
+# open whatever their cells hold. Cells are visited in the same order as the
+# list-of-lists versions, so both engines emit the same steps for the same
+# maze.
+
+def generate_maze_array(rows, cols, seed=None, density=0.3):
+    """Random walls as a uint8 array, generated in one vectorized call"""
+    rng = np.random.default_rng(seed)
+    return (rng.random((rows, cols)) < density).astype(np.uint8)
+
+class Grid:
+    """
+    An immutable maze: row-major cell bytes (see TERRAIN) and a shape, which
+    both engines search in place. Being read-only, one Grid can be cached and
+    shared by any number of searches, threads and worker processes at once.
+    """
+    def __init__(self, cells, rows, cols):
+        cells = bytes(cells)
+        if len(cells) != rows * cols:
+            raise ValueError(f'{len(cells)} cells do not fill a {rows}x{cols} grid')
+        self._cells = cells
+        self._shape = (rows, cols)
+
+    @classmethod
+    def from_array(cls, array):
+        array = np.ascontiguousarray(array, dtype=np.uint8)
+        return cls(array.tobytes(), *array.shape)
+
+    @classmethod
+    def from_maze(cls, maze):
+        """From a list-of-lists maze"""
+        return cls(chain.from_iterable(maze), len(maze), len(maze[0]))
+
+    @property
+    def cells(self):
+        return self._cells
+
+    @property
+    def shape(self):
+        return self._shape
+
+    @property
+    def nbytes(self):
+        return len(self._cells)
+
+    def array(self):
+        """A read-only uint8 array view of the cells (no copy)"""
+        return np.frombuffer(self._cells, dtype=np.uint8).reshape(self._shape)
+
+    def tolist(self):
+        """The Python engine's list-of-lists maze"""
+        return self.array().tolist()
+
+# Byte translation tables from cell values to a passable mask and to costs
+_PASSABLE_TABLE = bytes(value != 1 for value in range(256))
+_COST_TABLE = bytes(0 if value == 1 else max(value, 1) for value in range(256))
+
+def _cells(grid):
+    """Row-major cell bytes of a Grid or uint8 array; a Grid's are shared, not copied"""
+    if isinstance(grid, Grid):
+        return grid.cells
+    return np.ascontiguousarray(grid, dtype=np.uint8).tobytes()
+
+def _cell_index(cell, rows, cols):
+    """Flat index of a (row, col) cell; out-of-range cells would wrap around, so they raise"""
+    r, c = cell
+    if not (0 <= r < rows and 0 <= c < cols):
+        raise ValueError(f'Cell {list(cell)} lies outside the {rows}x{cols} maze')
+    return r * cols + c
+
+def _shape(maze):
+    """(rows, cols) of a Grid or list-of-lists maze"""
+    if isinstance(maze, Grid):
+        return maze.shape
+    return len(maze), len(maze[0])
+
+def _open_ends(flat, cols, start, end):
+    """Mark start and end open (cost 1) in a flat mask or cost list, which belongs to the search"""
+    rows = len(flat) // cols
+    flat[_cell_index(start, rows, cols)] = 1
+    flat[_cell_index(end, rows, cols)] = 1
+    return flat
+
+def _passable(grid, start, end):
+    """Flat 0/1 mask of open cells, with start and end always open"""
+    return _open_ends(bytearray(_cells(grid).translate(_PASSABLE_TABLE)), grid.shape[1], start, end)
+
+def _neighbors(idx, rows, cols):
+    """Flat indices of in-bounds neighbors, in the order right, down, left, up"""
+    r, c = divmod(idx, cols)
+    neighbors = []
+    if c + 1 < cols:
+        neighbors.append(idx + 1)
+    if r + 1 < rows:
+        neighbors.append(idx + cols)
+    if c > 0:
+        neighbors.append(idx - 1)
+    if r > 0:
+        neighbors.append(idx - cols)
+    return neighbors
+
+def _array_path(parent, idx, start, cols):
+    path = []
+    while parent[idx] >= 0:
+        path.append(list(divmod(idx, cols)))
+        idx = parent[idx]
+    path.append(list(start))
+    path.reverse()
+    return path
+
+def dijkstra_array_steps(grid, start, end, trace_format='full', diagonal=False, **trace_options):
+    rows, cols = grid.shape
+    return _dial_search(_costs(grid, start, end), rows, cols, start, end, diagonal, False,
+                        trace_format, trace_options)
+
+def a_star_array_steps(grid, start, end, trace_format='full', diagonal=False, **trace_options):
+    rows, cols = grid.shape
+    return _dial_search(_costs(grid, start, end), rows, cols, start, end, diagonal, True,
+                        trace_format, trace_options)
+
+def bfs_array_steps(grid, start, end, trace_format='full', **trace_options):
+    rows, cols = grid.shape
+    passable = _passable(grid, start, end)
+    source = _cell_index(start, rows, cols)
+    target = _cell_index(end, rows, cols)
+
+    queued = bytearray(rows * cols)
+    visited = []
+    trace = new_trace(visited, trace_format, **trace_options)
+    parent = array('i', [-1]) * (rows * cols)
+    queue = deque([source])
+    queued[source] = 1
+
+    while queue:
+        idx = queue.popleft()
+
+        cell = divmod(idx, cols)
+        visited.append(cell)
+        yield trace.step(cell)
+
+        if idx == target:
+            yield trace.step(cell, _array_path(parent, idx, start, cols))
+            break
+
+        for nidx in _neighbors(idx, rows, cols):
+            if passable[nidx] and not queued[nidx]:
+                parent[nidx] = idx
+                queue.append(nidx)
+                queued[nidx] = 1
+                trace.push(divmod(nidx, cols))
+
+def dfs_array_steps(grid, start, end, trace_format='full', **trace_options):
+    rows, cols = grid.shape
+    passable = _passable(grid, start, end)
+    source = _cell_index(start, rows, cols)
+    target = _cell_index(end, rows, cols)
+
+    seen = bytearray(rows * cols)
+    pushed = bytearray(rows * cols)
+    visited = []
+    trace = new_trace(visited, trace_format, **trace_options)
+    parent = array('i', [-1]) * (rows * cols)
+    stack = [source]
+    pushed[source] = 1
+
+    while stack:
+        idx = stack.pop()
+
+        seen[idx] = 1
+        cell = divmod(idx, cols)
+        visited.append(cell)
+        yield trace.step(cell)
+
+        if idx == target:
+            yield trace.step(cell, _array_path(parent, idx, start, cols))
+            break
+
+        # Push neighbors in reverse order for DFS
+        for nidx in reversed(_neighbors(idx, rows, cols)):
+            if passable[nidx] and not seen[nidx] and not pushed[nidx]:
+                parent[nidx] = idx
+                stack.append(nidx)
+                pushed[nidx] = 1
+                trace.push(divmod(nidx, cols))
+
+
+# ============ WEIGHTED SEARCH ============
+# Dijkstra and A* for both engines, on a flat array of the cost to enter
+# each cell (0 for walls). Costs are small integers, so the open set is a
+# bucket queue (Dial's algorithm) instead of a heap: pushes and pops are
+# O(1) and a search costs O(V + E + D) for a goal at distance D.
+#
+# Diagonal moves cost 14 and straight ones 10 (times the terrain cost), an
+# integer approximation of sqrt(2); a diagonal may not cut the corner of a
+# wall. Without diagonals moves cost 1.
+
+STRAIGHT_COST = 10
+DIAGONAL_COST = 14
+
+def _maze_costs(maze, start, end):
+    """Flat cost to enter each cell of a list-of-lists maze or Grid (0 = wall), with start and end open at cost 1"""
+    if isinstance(maze, Grid):
+        return _costs(maze, start, end)
+    costs = bytearray(0 if cell == 1 else max(cell, 1) for row in maze for cell in row)
+    return _open_ends(costs, len(maze[0]), start, end)
+
+def _costs(grid, start, end):
+    """Flat cost to enter each cell of a grid (0 = wall), with start and end open at cost 1"""
+    return _open_ends(bytearray(_cells(grid).translate(_COST_TABLE)), grid.shape[1], start, end)
+
+def _dial_search(costs, rows, cols, start, end, diagonal, guided, trace_format, trace_options, visited=None):
+    """
+    Dijkstra, or A* when `guided`. Bucket k of the ring holds cells whose
+    priority (distance, plus the heuristic for A*) is k modulo its size;
+    the ring is sized so every queued priority fits. Entries are not
+    removed when a cell's distance improves: stale ones are skipped when
+    popped. Dijkstra takes each bucket first in, first out, which on uniform
+    ground is exactly BFS order; A* takes the newest entry first, following
+    its latest (deepest) progress between cells of equal f_score. Ties are
+    therefore no longer broken by (row, col) as with the heap these searches
+    used to run on, so their steps differ from it wherever priorities tie.
+    `visited` is the container full steps list; the Python engine passes a
+    set, like its BFS and DFS, so its steps list cells in the same order.
+    """
+    source = _cell_index(start, rows, cols)
+    target = _cell_index(end, rows, cols)
+    end_r, end_c = end
+
+    straight = STRAIGHT_COST if diagonal else 1
+    moves = [(0, 1, straight), (1, 0, straight), (0, -1, straight), (-1, 0, straight)]
+    if diagonal:
+        moves += [(1, 1, DIAGONAL_COST), (1, -1, DIAGONAL_COST), (-1, -1, DIAGONAL_COST), (-1, 1, DIAGONAL_COST)]
+    longest = moves[-1][2]
+
+    def heuristic(idx):
+        if not guided:
+            return 0
+        dr, dc = abs(idx // cols - end_r), abs(idx % cols - end_c)
+        if diagonal:
+            return STRAIGHT_COST * max(dr, dc) + (DIAGONAL_COST - STRAIGHT_COST) * min(dr, dc)
+        return dr + dc
+
+    # A pushed priority exceeds the popped one by at most one move's cost
+    # plus the heuristic's change over it
+    ring = max(costs) * longest + longest + 1
+    buckets = [deque() for _ in range(ring)]
+
+    seen = bytearray(rows * cols)
+    if visited is None:
+        visited = []
+    expand = visited.add if isinstance(visited, set) else visited.append
+    trace = new_trace(visited, trace_format, **trace_options)
+    g_score = array('i', [-1]) * (rows * cols)
+    parent = array('i', [-1]) * (rows * cols)
+    g_score[source] = 0
+    current = heuristic(source)
+    buckets[current % ring].append(source)
+    pending = 1
+
+    while pending:
+        bucket = buckets[current % ring]
+        if not bucket:
+            current += 1
+            continue
+        idx = bucket.pop() if guided else bucket.popleft()
+        pending -= 1
+
+        if seen[idx] or g_score[idx] + heuristic(idx) != current:
+            continue
+
+        seen[idx] = 1
+        r, c = divmod(idx, cols)
+        expand((r, c))
+        yield trace.step((r, c))
+
+        if idx == target:
+            yield trace.step((r, c), _array_path(parent, idx, start, cols))
+            break
+
+        for dr, dc, move in moves:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            nidx = nr * cols + nc
+            if seen[nidx] or not costs[nidx]:
+                continue
+            if dr and dc and not (costs[r * cols + nc] and costs[nr * cols + c]):
+                continue
+            tentative_g = g_score[idx] + costs[nidx] * move
+            if g_score[nidx] < 0 or tentative_g < g_score[nidx]:
+                g_score[nidx] = tentative_g
+                parent[nidx] = idx
+                buckets[(tentative_g + heuristic(nidx)) % ring].append(nidx)
+                pending += 1
+                trace.push((nr, nc))
+
+
+# ============ BIDIRECTIONAL AND JUMP POINT SEARCH ============
+# Shared by both engines: each search runs on a flat passable mask like the
+# array engine, so the Python and NumPy entry points below only differ in
+# how they build it and emit the same steps for the same maze.
+
+SIDES = ('start', 'end')
+
+def _maze_passable(maze, start, end):
+    """Flat 0/1 mask of the open cells of a list-of-lists maze or Grid, with start and end always open"""
+    if isinstance(maze, Grid):
+        return _passable(maze, start, end)
+    return _open_ends(bytearray(cell != 1 for row in maze for cell in row), len(maze[0]), start, end)
+
+def _chain(parent, idx):
+    """Flat indices from idx back to the root of its search"""
+    chain = [idx]
+    while parent[chain[-1]] >= 0:
+        chain.append(parent[chain[-1]])
+    return chain
+
+def _meeting_path(parents, side, here, there, cols):
+    """Path through the edge `here` (reached from `side`) -> `there` (reached from the other side)"""
+    chain = _chain(parents[side], here)[::-1] + _chain(parents[1 - side], there)
+    if side == 1:
+        chain.reverse()
+    return [list(divmod(idx, cols)) for idx in chain]
+
+def _bidirectional_bfs(passable, rows, cols, start, end, trace_format, trace_options):
+    """
+    Breadth-first from both ends, one whole layer at a time, always growing
+    the side with the smaller frontier. The first layer that touches the
+    other search is finished and the shortest of its connections taken.
+    """
+    source = _cell_index(start, rows, cols)
+    target = _cell_index(end, rows, cols)
+
+    visited = []
+    trace = new_trace(visited, trace_format, **trace_options)
+    dist = [array('i', [-1]) * (rows * cols) for _ in SIDES]
+    parents = [array('i', [-1]) * (rows * cols) for _ in SIDES]
+    dist[0][source] = 0
+    dist[1][target] = 0
+    frontiers = [[source], [target]]
+
+    if source == target:
+        visited.append(tuple(start))
+        yield trace.step(start, side=SIDES[0])
+        yield trace.step(start, [list(start)], side=SIDES[0])
+        return
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other, parent = dist[side], dist[1 - side], parents[side]
+        best = None
+        layer = []
+
+        for idx in frontiers[side]:
+            cell = divmod(idx, cols)
+            visited.append(cell)
+            yield trace.step(cell, side=SIDES[side])
+
+            for nidx in _neighbors(idx, rows, cols):
+                if not passable[nidx]:
+                    continue
+                if other[nidx] >= 0:
+                    length = own[idx] + 1 + other[nidx]
+                    if best is None or length < best[0]:
+                        best = (length, idx, nidx)
+                elif own[nidx] < 0:
+                    own[nidx] = own[idx] + 1
+                    parent[nidx] = idx
+                    layer.append(nidx)
+                    trace.push(divmod(nidx, cols))
+
+        if best:
+            _, here, there = best
+            yield trace.step(divmod(here, cols), _meeting_path(parents, side, here, there, cols),
+                             side=SIDES[side])
+            return
+        frontiers[side] = layer
+
+def _bidirectional_a_star(passable, rows, cols, start, end, trace_format, trace_options):
+    """
+    A* from both ends (Manhattan distance to the opposite end), expanding
+    the side with the smaller open set. `best` is the shortest connection
+    seen so far; once either side's smallest f_score reaches it no shorter
+    path can remain. Heap entries are (f_score, h, index): ties go to the
+    cell closer to the goal, which keeps open grids from expanding every
+    cell of equal f_score.
+    """
+    source = _cell_index(start, rows, cols)
+    target = _cell_index(end, rows, cols)
+    goals = (end, start)
+
+    visited = []
+    trace = new_trace(visited, trace_format, **trace_options)
+    g_score = [array('i', [-1]) * (rows * cols) for _ in SIDES]
+    parents = [array('i', [-1]) * (rows * cols) for _ in SIDES]
+    closed = [bytearray(rows * cols) for _ in SIDES]
+    g_score[0][source] = 0
+    g_score[1][target] = 0
+    h = abs(start[0] - end[0]) + abs(start[1] - end[1])
+    open_sets = [[(h, h, source)], [(h, h, target)]]
+    best = None  # (length, meeting index)
+
+    if source == target:
+        visited.append(tuple(start))
+        yield trace.step(start, side=SIDES[0])
+        yield trace.step(start, [list(start)], side=SIDES[0])
+        return
+
+    while True:
+        for side in (0, 1):
+            heap = open_sets[side]
+            while heap and closed[side][heap[0][2]]:
+                heapq.heappop(heap)
+        if not open_sets[0] or not open_sets[1]:
+            break
+        if best and max(open_sets[0][0][0], open_sets[1][0][0]) >= best[0]:
+            break
+
+        side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        own, other, parent = g_score[side], g_score[1 - side], parents[side]
+        goal_r, goal_c = goals[side]
+        _, _, idx = heapq.heappop(open_sets[side])
+
+        closed[side][idx] = 1
+        cell = divmod(idx, cols)
+        if not closed[1 - side][idx]:  # Both searches may expand a cell; list it once
+            visited.append(cell)
+        yield trace.step(cell, side=SIDES[side])
+
+        tentative_g = own[idx] + 1
+        for nidx in _neighbors(idx, rows, cols):
+            if passable[nidx] and not closed[side][nidx]:
+                if own[nidx] < 0 or tentative_g < own[nidx]:
+                    own[nidx] = tentative_g
+                    parent[nidx] = idx
+                    nr, nc = divmod(nidx, cols)
+                    h = abs(nr - goal_r) + abs(nc - goal_c)
+                    heapq.heappush(open_sets[side], (tentative_g + h, h, nidx))
+                    trace.push((nr, nc))
+                    if other[nidx] >= 0 and (best is None or tentative_g + other[nidx] < best[0]):
+                        best = (tentative_g + other[nidx], nidx)
+
+    if best:
+        meet = best[1]
+        chain = _chain(parents[0], meet)[::-1] + _chain(parents[1], meet)[1:]
+        path = [list(divmod(idx, cols)) for idx in chain]
+        yield trace.step(visited[-1], path, side=SIDES[side])
+
+def _jump_point_search(passable, rows, cols, start, end, trace_format, trace_options):
+    """
+    Jump Point Search adapted to 4-connected moves. Among equally short
+    paths only those that go vertically as early as possible are followed:
+    a horizontal run may only turn where the cell diagonally behind the turn
+    is blocked. Straight runs are scanned without touching the heap and
+    only the cells where such a path can turn (jump points) are expanded,
+    by A* on (f_score, h, index) entries. The path lists every cell.
+    """
+    source = _cell_index(start, rows, cols)
+    target = _cell_index(end, rows, cols)
+    end_r, end_c = end
+
+    def is_open(r, c):
+        return 0 <= r < rows and 0 <= c < cols and passable[r * cols + c]
+
+    def jump_horizontal(r, c, dc):
+        while True:
+            c += dc
+            if not is_open(r, c):
+                return -1
+            idx = r * cols + c
+            if idx == target:
+                return idx
+            for dr in (1, -1):
+                if is_open(r + dr, c) and not is_open(r + dr, c - dc):
+                    return idx
+
+    def jump_vertical(r, c, dr):
+        while True:
+            r += dr
+            if not is_open(r, c):
+                return -1
+            idx = r * cols + c
+            if idx == target or jump_horizontal(r, c, 1) >= 0 or jump_horizontal(r, c, -1) >= 0:
+                return idx
+
+    def directions(idx, parent_idx):
+        """Directions worth scanning from a jump point reached from parent_idx"""
+        if parent_idx < 0:
+            return [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        r, c = divmod(idx, cols)
+        pr, pc = divmod(parent_idx, cols)
+        if pc == c:
+            dr = 1 if r > pr else -1
+            return [(dr, 0), (0, 1), (0, -1)]
+        dc = 1 if c > pc else -1
+        return [(0, dc)] + [(dr, 0) for dr in (1, -1)
+                            if is_open(r + dr, c) and not is_open(r + dr, c - dc)]
+
+    seen = bytearray(rows * cols)
+    visited = []
+    trace = new_trace(visited, trace_format, **trace_options)
+    g_score = array('i', [-1]) * (rows * cols)
+    parent = array('i', [-1]) * (rows * cols)
+    g_score[source] = 0
+    h = abs(start[0] - end_r) + abs(start[1] - end_c)
+    open_set = [(h, h, source)]
+
+    while open_set:
+        _, _, idx = heapq.heappop(open_set)
+
+        if seen[idx]:
+            continue
+
+        seen[idx] = 1
+        cell = divmod(idx, cols)
+        visited.append(cell)
+        yield trace.step(cell)
+
+        if idx == target:
+            path = [list(start)]
+            points = _chain(parent, idx)[::-1]
+            for a, b in zip(points, points[1:]):
+                (ar, ac), (br, bc) = divmod(a, cols), divmod(b, cols)
+                if ar == br:
+                    sign = 1 if bc > ac else -1
+                    path.extend([ar, c] for c in range(ac + sign, bc + sign, sign))
+                else:
+                    sign = 1 if br > ar else -1
+                    path.extend([r, ac] for r in range(ar + sign, br + sign, sign))
+            yield trace.step(cell, path)
+            break
+
+        r, c = cell
+        for dr, dc in directions(idx, parent[idx]):
+            nidx = jump_horizontal(r, c, dc) if dr == 0 else jump_vertical(r, c, dr)
+            if nidx < 0 or seen[nidx]:
+                continue
+            nr, nc = divmod(nidx, cols)
+            tentative_g = g_score[idx] + abs(nr - r) + abs(nc - c)
+            if g_score[nidx] < 0 or tentative_g < g_score[nidx]:
+                g_score[nidx] = tentative_g
+                parent[nidx] = idx
+                h = abs(nr - end_r) + abs(nc - end_c)
+                heapq.heappush(open_set, (tentative_g + h, h, nidx))
+                trace.push((nr, nc))
+
+
+def bidirectional_bfs_steps(maze, start, end, trace_format='full', **trace_options):
+    rows, cols = _shape(maze)
+    return _bidirectional_bfs(_maze_passable(maze, start, end), rows, cols, start, end, trace_format, trace_options)
+
+def bidirectional_a_star_steps(maze, start, end, trace_format='full', **trace_options):
+    rows, cols = _shape(maze)
+    return _bidirectional_a_star(_maze_passable(maze, start, end), rows, cols, start, end, trace_format, trace_options)
+
+def jps_steps(maze, start, end, trace_format='full', **trace_options):
+    rows, cols = _shape(maze)
+    return _jump_point_search(_maze_passable(maze, start, end), rows, cols, start, end, trace_format, trace_options)
+
+def bidirectional_bfs_array_steps(grid, start, end, trace_format='full', **trace_options):
+    rows, cols = grid.shape
+    return _bidirectional_bfs(_passable(grid, start, end), rows, cols, start, end, trace_format, trace_options)
+
+def bidirectional_a_star_array_steps(grid, start, end, trace_format='full', **trace_options):
+    rows, cols = grid.shape
+    return _bidirectional_a_star(_passable(grid, start, end), rows, cols, start, end, trace_format, trace_options)
+
+def jps_array_steps(grid, start, end, trace_format='full', **trace_options):
+    rows, cols = grid.shape
+    return _jump_point_search(_passable(grid, start, end), rows, cols, start, end, trace_format, trace_options)
+
+
+# ============ STEP LISTS ============
+# Eager versions of the generators above, returning the whole trace at once
+
+def dijkstra(maze, start, end, trace_format='full', **trace_options):
+    return list(dijkstra_steps(maze, start, end, trace_format, **trace_options))
+
+def a_star(maze, start, end, trace_format='full', **trace_options):
+    return list(a_star_steps(maze, start, end, trace_format, **trace_options))
+
+def bfs(maze, start, end, trace_format='full', **trace_options):
+    return list(bfs_steps(maze, start, end, trace_format, **trace_options))
+
+def dfs(maze, start, end, trace_format='full', **trace_options):
+    return list(dfs_steps(maze, start, end, trace_format, **trace_options))
+
+def bidirectional_bfs(maze, start, end, trace_format='full', **trace_options):
+    return list(bidirectional_bfs_steps(maze, start, end, trace_format, **trace_options))
+
+def bidirectional_a_star(maze, start, end, trace_format='full', **trace_options):
+    return list(bidirectional_a_star_steps(maze, start, end, trace_format, **trace_options))
 
-    return steps
\ No newline at end of file
+def jps(maze, start, end, trace_format='full', **trace_options):
+    return list(jps_steps(maze, start, end, trace_format, **trace_options))
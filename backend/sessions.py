@@ -0,0 +1,119 @@
+import itertools
+import json
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+# ============ TRACE SESSIONS ============
+# A run is recorded once as a delta trace and kept server-side, so clients
+# fetch just the frames they are about to show instead of the whole trace.
+# The log is split into segments of KEYFRAME_INTERVAL steps, each starting
+# with a keyframe and stored as zlib-compressed JSON; reading a range only
+# decompresses and replays the segments it overlaps.
+
+KEYFRAME_INTERVAL = 256
+
+# Most frames a single read returns
+MAX_RANGE = 2000
+
+
+def record(steps, keyframe_interval=KEYFRAME_INTERVAL):
+    """
+    Compress a delta trace recorded with `keyframe_interval` into segments.
+    Returns (step count, segments); only one segment is held uncompressed.
+    """
+    steps = iter(steps)
+    segments = []
+    count = 0
+    while True:
+        chunk = list(itertools.islice(steps, keyframe_interval))
+        if not chunk:
+            return count, segments
+        count += len(chunk)
+        segments.append(zlib.compress(json.dumps(chunk, separators=(',', ':')).encode()))
+
+
+class TraceSession:
+    def __init__(self, meta, count, segments, expand, keyframe_interval=KEYFRAME_INTERVAL):
+        self.id = uuid.uuid4().hex
+        self.meta = meta
+        self.count = count
+        self.segments = segments
+        self.expand = expand
+        self.keyframe_interval = keyframe_interval
+        self.size = sum(len(segment) for segment in segments) + len(json.dumps(meta))
+        self.last_access = time.monotonic()
+
+    def frames(self, lo, hi):
+        """Full steps lo..hi-1, replayed from the keyframe at or before lo"""
+        first = lo // self.keyframe_interval
+        last = (hi - 1) // self.keyframe_interval
+        deltas = itertools.chain.from_iterable(
+            json.loads(zlib.decompress(segment)) for segment in self.segments[first:last + 1]
+        )
+        offset = first * self.keyframe_interval
+        return list(itertools.islice(self.expand(deltas), lo - offset, hi - offset))
+
+
+class TraceStore:
+    """
+    Trace sessions by id. Sessions idle for longer than `ttl` seconds expire,
+    and the least recently read ones are evicted once the compressed logs
+    exceed `max_bytes` in total.
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sessions = OrderedDict()
+        self.size = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def _drop(self, session_id):
+        session = self.sessions.pop(session_id)
+        self.size -= session.size
+        self.evictions += 1
+
+    def _expire(self, now):
+        # Least recently read first, so expired sessions sit at the front
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_access <= self.ttl:
+                break
+            self._drop(session_id)
+
+    def add(self, session):
+        """Store a session; False if it alone exceeds the memory budget"""
+        if session.size > self.max_bytes:
+            return False
+        with self.lock:
+            self._expire(time.monotonic())
+            self.sessions[session.id] = session
+            self.size += session.size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self.sessions)))
+        return True
+
+    def get(self, session_id):
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_access = now
+            self.sessions.move_to_end(session_id)
+            return session
+
+    def stats(self):
+        with self.lock:
+            self._expire(time.monotonic())
+            return {
+                'sessions': len(self.sessions),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'evictions': self.evictions
+            }
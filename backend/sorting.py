@@ -1,230 +1,384 @@
+from itertools import chain, compress
+
+# ============ STEP TRACES ============
+
+# Every n-th step of a delta trace carries a full copy of the array
+KEYFRAME_INTERVAL = 500
+
+# How steps list sorted positions: every index, or inclusive [lo, hi] runs
+SORTED_FORMATS = ('indices', 'runs')
+
+
+class SortedTracker:
+    """
+    Positions of an array known to hold their final value, as a bitmap.
+
+    Marking is O(1) amortized per position: next_unmarked (path-compressed)
+    skips straight over positions that are already marked, so re-marking
+    sorted ranges, as merge sort does for every merged run, costs nothing
+    extra. Listings are built with C-level scans of the bitmap (memchr for
+    runs) and cached until the next change; callers must not modify them.
+    Index listings slice `positions` rather than creating fresh ints.
+    """
+    def __init__(self, n):
+        self.n = n
+        self.marked = bytearray(n)
+        self.positions = list(range(n))
+        self.next_unmarked = list(range(n + 1))
+        self.count = 0
+        self.run_count = 0
+        self._indices = []
+        self._runs = []
+
+    def _find(self, k):
+        root = k
+        while self.next_unmarked[root] != root:
+            root = self.next_unmarked[root]
+        while self.next_unmarked[k] != root:
+            self.next_unmarked[k], k = root, self.next_unmarked[k]
+        return root
+
+    def mark(self, lo, hi):
+        """Mark lo..hi (inclusive). Returns the newly marked runs as [[lo, hi], ...]"""
+        new = []
+        k = self._find(max(lo, 0))
+        hi = min(hi, self.n - 1)
+        while k <= hi:
+            start = k
+            while k <= hi and not self.marked[k]:
+                self.marked[k] = 1
+                self.next_unmarked[k] = k + 1
+                k += 1
+            new.append([start, k - 1])
+            self.count += k - start
+            # A new run, unless it joins the runs on either side
+            self.run_count += 1 - (start > 0 and self.marked[start - 1]) - (k < self.n and self.marked[k])
+            k = self._find(k)
+        if new:
+            self._indices = self._runs = None
+        return new
+
+    def runs(self):
+        """Marked positions as inclusive [lo, hi] runs in ascending order"""
+        if self._runs is None:
+            runs = []
+            find = self.marked.find
+            k = find(1)
+            while k != -1:
+                end = find(0, k)
+                if end == -1:
+                    end = self.n
+                runs.append([k, end - 1])
+                k = find(1, end)
+            self._runs = runs
+        return self._runs
+
+    def indices(self):
+        """Marked positions in ascending order"""
+        if self._indices is None:
+            if self.run_count * 8 > self.count:
+                # Fragmented: one pass over the whole bitmap is cheaper
+                self._indices = list(compress(self.positions, self.marked))
+            else:
+                positions = self.positions
+                self._indices = list(chain.from_iterable(positions[lo:hi + 1] for lo, hi in self.runs()))
+        return self._indices
+
+    def listing(self, sorted_format='indices'):
+        return self.runs() if sorted_format == 'runs' else self.indices()
+
+
+class FullTrace:
+    """
+    Records every step as a full snapshot of the array and sorted positions
+    (listed as `sorted_format`, see SORTED_FORMATS).
+    With a `sampler`, steps the sampler skips are not built and come out as None.
+    """
+    def __init__(self, arr, sampler=None, sorted_format='indices'):
+        self.arr = arr
+        self.sorted = SortedTracker(len(arr))
+        self.sorted_format = sorted_format
+        self.sampler = sampler
+
+    def mark_sorted(self, lo, hi):
+        """Mark indices lo..hi (inclusive) as being in their final position"""
+        self.sorted.mark(lo, hi)
+
+    def step(self, changed=(), **marks):
+        if self.sampler and not self.sampler.keep(marks):
+            return None
+        step = {'array': self.arr.copy()}
+        step.update(marks)
+        step['sorted'] = self.sorted.listing(self.sorted_format)
+        return step
+
+
+class DeltaTrace:
+    """
+    Records only what changed at each step:
+      - 'set': [[index, value], ...] writes applied to the array by this step
+      - 'sorted_add': [[lo, hi], ...] inclusive ranges that became sorted
+    Every `keyframe_interval` steps (starting with the first) the step also
+    carries 'keyframe', 'array' and 'sorted' (listed as `sorted_format`)
+    describing the full state after the step, so a client can seek without
+    replaying the whole trace.
+    """
+    def __init__(self, arr, keyframe_interval=KEYFRAME_INTERVAL, sorted_format='indices'):
+        self.arr = arr
+        self.sorted = SortedTracker(len(arr))
+        self.sorted_format = sorted_format
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.pending_sorted = []
+        self.count = 0
+
+    def mark_sorted(self, lo, hi):
+        self.pending_sorted.extend(self.sorted.mark(lo, hi))
+
+    def step(self, changed=(), **marks):
+        step = marks
+        if changed:
+            step['set'] = [[k, self.arr[k]] for k in changed]
+        if self.pending_sorted:
+            step['sorted_add'] = self.pending_sorted
+            self.pending_sorted = []
+        if self.count % self.keyframe_interval == 0:
+            step['keyframe'] = True
+            step['array'] = self.arr.copy()
+            step['sorted'] = self.sorted.listing(self.sorted_format)
+        self.count += 1
+        return step
+
+
+class StepSampler:
+    """
+    Keeps at most `max_steps` evenly spaced steps of a run, always including
+    the final 'complete' step, without ever holding more than that in memory.
+    Steps are kept every `stride` steps; whenever the buffer fills up, every
+    other kept step is dropped and the stride doubles.
+    """
+    def __init__(self, max_steps):
+        self.max_steps = max(2, int(max_steps))
+        self.stride = 1
+        self.count = 0
+
+    def keep(self, marks):
+        index = self.count
+        self.count += 1
+        return index % self.stride == 0 or marks.get('complete', False)
+
+    def collect(self, steps):
+        kept = []
+        final = None
+        for step in steps:
+            if step is None:
+                continue
+            if step.get('complete'):
+                final = step
+                continue
+            kept.append(step)
+            # One slot stays reserved for the final step
+            if len(kept) > self.max_steps - 1:
+                kept = kept[::2]
+                self.stride *= 2
+        if final is not None:
+            kept.append(final)
+        return kept
+
+
+TRACE_FORMATS = {
+    'full': FullTrace,
+    'delta': DeltaTrace
+}
+
+
+def new_trace(arr, trace_format='full', **options):
+    trace_cls = TRACE_FORMATS.get(trace_format)
+    if not trace_cls:
+        raise ValueError(f"Unknown trace format: {trace_format}")
+    return trace_cls(arr, **options)
+
+
+def expand_delta(steps):
+    """
+    Turn delta steps back into full steps. The first step must be a keyframe;
+    steps carry the same fields as FullTrace's.
+    """
+    arr = None
+    done = None
+    for step in steps:
+        marks = dict(step)
+        writes = marks.pop('set', ())
+        ranges = marks.pop('sorted_add', ())
+        if marks.pop('keyframe', False):
+            # Keyframes hold the state after the step
+            arr = marks.pop('array')
+            done = SortedTracker(len(arr))
+            for entry in marks.pop('sorted'):
+                # Either an index or a [lo, hi] run
+                lo, hi = entry if isinstance(entry, list) else (entry, entry)
+                done.mark(lo, hi)
+        else:
+            for k, value in writes:
+                arr[k] = value
+            for lo, hi in ranges:
+                done.mark(lo, hi)
+        full = {'array': arr.copy()}
+        full.update(marks)
+        full['sorted'] = done.indices()
+        yield full
+
+
 # ============ SORTING ALGORITHMS ============
 
-def bubble_sort(arr):
-    steps = []
+def bubble_sort_steps(arr, trace_format='full', **trace_options):
     arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
     n = len(arr_copy)
-    
+
     for i in range(n):
+        if i > 0:
+            trace.mark_sorted(n - i, n - i)
+
         for j in range(0, n - i - 1):
-            steps.append({
-                'array': arr_copy.copy(),
-                'comparing': [j, j + 1],
-                'sorted': list(range(n - i, n))
-            })
-            
+            yield trace.step(comparing=[j, j + 1])
+
             if arr_copy[j] > arr_copy[j + 1]:
                 arr_copy[j], arr_copy[j + 1] = arr_copy[j + 1], arr_copy[j]
-                steps.append({
-                    'array': arr_copy.copy(),
-                    'swapping': [j, j + 1],
-                    'sorted': list(range(n - i, n))
-                })
-    
-    steps.append({
-        'array': arr_copy.copy(),
-        'sorted': list(range(n)),
-        'comparing': [],
-        'complete': True
-    })
-    
-    return steps
-
-def quick_sort(arr):
-    steps = []
+                yield trace.step((j, j + 1), swapping=[j, j + 1])
+
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(comparing=[], complete=True)
+
+
+def _partition_steps(arr, trace, low, high):
+    """Lomuto partition of arr[low..high] around arr[high]; returns the pivot's final index"""
+    pivot = arr[high]
+    i = low - 1
+
+    yield trace.step(pivot=high, range=[low, high])
+
+    for j in range(low, high):
+        yield trace.step(comparing=[j, high], pivot=high)
+
+        if arr[j] < pivot:
+            i += 1
+            arr[i], arr[j] = arr[j], arr[i]
+            if i != j:
+                yield trace.step((i, j), swapping=[i, j], pivot=high)
+
+    arr[i + 1], arr[high] = arr[high], arr[i + 1]
+    yield trace.step((i + 1, high), swapping=[i + 1, high], pivot=i + 1)
+
+    return i + 1
+
+
+def quick_sort_steps(arr, trace_format='full', **trace_options):
     arr_copy = arr.copy()
-    sorted_indices = set()  # Track sorted elements
-    
-    def partition(low, high):
-        pivot = arr_copy[high]
-        i = low - 1
-        
-        steps.append({
-            'array': arr_copy.copy(),
-            'pivot': high,
-            'range': [low, high],
-            'sorted': list(sorted_indices)
-        })
-        
-        for j in range(low, high):
-            steps.append({
-                'array': arr_copy.copy(),
-                'comparing': [j, high],
-                'pivot': high,
-                'sorted': list(sorted_indices)
-            })
-            
-            if arr_copy[j] < pivot:
-                i += 1
-                arr_copy[i], arr_copy[j] = arr_copy[j], arr_copy[i]
-                if i != j:
-                    steps.append({
-                        'array': arr_copy.copy(),
-                        'swapping': [i, j],
-                        'pivot': high,
-                        'sorted': list(sorted_indices)
-                    })
-        
-        arr_copy[i + 1], arr_copy[high] = arr_copy[high], arr_copy[i + 1]
-        steps.append({
-            'array': arr_copy.copy(),
-            'swapping': [i + 1, high],
-            'pivot': i + 1,
-            'sorted': list(sorted_indices)
-        })
-        
-        return i + 1
-    
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+
     def quick_sort_helper(low, high):
         if low < high:
-            pi = partition(low, high)
-            sorted_indices.add(pi)  # Pivot is now in correct position
-            quick_sort_helper(low, pi - 1)
-            quick_sort_helper(pi + 1, high)
+            pi = yield from _partition_steps(arr_copy, trace, low, high)
+            trace.mark_sorted(pi, pi)  # Pivot is now in correct position
+            yield from quick_sort_helper(low, pi - 1)
+            yield from quick_sort_helper(pi + 1, high)
         elif low == high:
             # Single element is sorted
-            sorted_indices.add(low)
-    
-    quick_sort_helper(0, len(arr_copy) - 1)
-    
-    steps.append({
-        'array': arr_copy.copy(),
-        'sorted': list(range(len(arr_copy))),
-        'complete': True
-    })
-    
-    return steps
-
-def merge_sort(arr):
-    steps = []
-    arr_copy = arr.copy()
-    sorted_ranges = []  # Track which ranges are sorted
-    
-    def get_sorted_indices():
-        # Merge overlapping ranges to get all sorted indices
-        if not sorted_ranges:
-            return []
-        
-        # Flatten all sorted ranges
-        sorted_set = set()
-        for start, end in sorted_ranges:
-            sorted_set.update(range(start, end + 1))
-        return list(sorted_set)
-    
-    def merge(left, mid, right):
-        left_arr = arr_copy[left:mid + 1]
-        right_arr = arr_copy[mid + 1:right + 1]
-        
-        i = j = 0
-        k = left
-        
-        while i < len(left_arr) and j < len(right_arr):
-            steps.append({
-                'array': arr_copy.copy(),
-                'comparing': [left + i, mid + 1 + j],
-                'merging': [left, right],
-                'sorted': get_sorted_indices()
-            })
-            
-            if left_arr[i] <= right_arr[j]:
-                arr_copy[k] = left_arr[i]
-                i += 1
-            else:
-                arr_copy[k] = right_arr[j]
-                j += 1
-            k += 1
-            
-            steps.append({
-                'array': arr_copy.copy(),
-                'merging': [left, right],
-                'sorted': get_sorted_indices()
-            })
-        
-        while i < len(left_arr):
-            arr_copy[k] = left_arr[i]
+            trace.mark_sorted(low, low)
+
+    yield from quick_sort_helper(0, len(arr_copy) - 1)
+
+    trace.mark_sorted(0, len(arr_copy) - 1)
+    yield trace.step(complete=True)
+
+
+def _merge_steps(arr, trace, left, mid, right):
+    """Merge the sorted runs arr[left..mid] and arr[mid+1..right]"""
+    left_arr = arr[left:mid + 1]
+    right_arr = arr[mid + 1:right + 1]
+
+    i = j = 0
+    k = left
+
+    while i < len(left_arr) and j < len(right_arr):
+        yield trace.step(comparing=[left + i, mid + 1 + j], merging=[left, right])
+
+        if left_arr[i] <= right_arr[j]:
+            arr[k] = left_arr[i]
             i += 1
-            k += 1
-            steps.append({
-                'array': arr_copy.copy(),
-                'merging': [left, right],
-                'sorted': get_sorted_indices()
-            })
-        
-        while j < len(right_arr):
-            arr_copy[k] = right_arr[j]
+        else:
+            arr[k] = right_arr[j]
             j += 1
-            k += 1
-            steps.append({
-                'array': arr_copy.copy(),
-                'merging': [left, right],
-                'sorted': get_sorted_indices()
-            })
-        
-        # After merging, this range is sorted
-        sorted_ranges.append((left, right))
-    
+        k += 1
+
+        yield trace.step((k - 1,), merging=[left, right])
+
+    while i < len(left_arr):
+        arr[k] = left_arr[i]
+        i += 1
+        k += 1
+        yield trace.step((k - 1,), merging=[left, right])
+
+    while j < len(right_arr):
+        arr[k] = right_arr[j]
+        j += 1
+        k += 1
+        yield trace.step((k - 1,), merging=[left, right])
+
+    # After merging, this range is sorted
+    trace.mark_sorted(left, right)
+
+
+def merge_sort_steps(arr, trace_format='full', **trace_options):
+    arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+
     def merge_sort_helper(left, right):
         if left < right:
             mid = (left + right) // 2
-            merge_sort_helper(left, mid)
-            merge_sort_helper(mid + 1, right)
-            merge(left, mid, right)
-    
-    merge_sort_helper(0, len(arr_copy) - 1)
-    
-    steps.append({
-        'array': arr_copy.copy(),
-        'sorted': list(range(len(arr_copy))),
-        'complete': True
-    })
-    
-    return steps
+            yield from merge_sort_helper(left, mid)
+            yield from merge_sort_helper(mid + 1, right)
+            yield from _merge_steps(arr_copy, trace, left, mid, right)
+
+    yield from merge_sort_helper(0, len(arr_copy) - 1)
+
+    trace.mark_sorted(0, len(arr_copy) - 1)
+    yield trace.step(complete=True)
+
 
 # ============ INSERTION SORT ============
-def insertion_sort(arr):
-    steps = []
+def insertion_sort_steps(arr, trace_format='full', **trace_options):
     arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
     n = len(arr_copy)
 
+    if n > 1:
+        trace.mark_sorted(0, 0)
+
     for i in range(1, n):
         key = arr_copy[i]
         j = i - 1
 
         # Comparing phase
-        steps.append({
-            'array': arr_copy.copy(),
-            'comparing': [j, i],
-            'sorted': list(range(i))
-        })
+        yield trace.step(comparing=[j, i])
 
         while j >= 0 and arr_copy[j] > key:
             arr_copy[j + 1] = arr_copy[j]
-            steps.append({
-                'array': arr_copy.copy(),
-                'swapping': [j, j + 1],
-                'sorted': list(range(i))
-            })
+            yield trace.step((j + 1,), swapping=[j, j + 1])
             j -= 1
 
         arr_copy[j + 1] = key
-        steps.append({
-            'array': arr_copy.copy(),
-            'inserting': j + 1,
-            'sorted': list(range(i + 1))
-        })
+        trace.mark_sorted(i, i)
+        yield trace.step((j + 1,), inserting=j + 1)
 
-    steps.append({
-        'array': arr_copy.copy(),
-        'sorted': list(range(n)),
-        'complete': True
-    })
-    return steps
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(complete=True)
 
 
 # ============ SELECTION SORT ============
-def selection_sort(arr):
-    steps = []
+def selection_sort_steps(arr, trace_format='full', **trace_options):
     arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
     n = len(arr_copy)
 
     for i in range(n):
@@ -232,32 +386,288 @@ def selection_sort(arr):
 
         # Highlight the current unsorted region
         for j in range(i + 1, n):
-            steps.append({
-                'array': arr_copy.copy(),
-                'comparing': [min_idx, j],
-                'sorted': list(range(i))
-            })
+            yield trace.step(comparing=[min_idx, j])
 
             if arr_copy[j] < arr_copy[min_idx]:
                 min_idx = j
 
+        trace.mark_sorted(i, i)
+
         # Swap the found minimum into position
         if min_idx != i:
             arr_copy[i], arr_copy[min_idx] = arr_copy[min_idx], arr_copy[i]
-            steps.append({
-                'array': arr_copy.copy(),
-                'swapping': [i, min_idx],
-                'sorted': list(range(i + 1))
-            })
+            yield trace.step((i, min_idx), swapping=[i, min_idx])
         else:
-            steps.append({
-                'array': arr_copy.copy(),
-                'sorted': list(range(i + 1))
-            })
-
-    steps.append({
-        'array': arr_copy.copy(),
-        'sorted': list(range(n)),
-        'complete': True
-    })
-    return steps
\ No newline at end of file
+            yield trace.step()
+
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(complete=True)
+
+
+# ============ HEAP SORT ============
+
+def _sift_down_steps(arr, trace, lo, root, size):
+    """Sift arr[lo + root] down the max-heap stored in arr[lo:lo + size]"""
+    while True:
+        largest = root
+        for child in (2 * root + 1, 2 * root + 2):
+            if child < size:
+                yield trace.step(comparing=[lo + largest, lo + child])
+                if arr[lo + child] > arr[lo + largest]:
+                    largest = child
+        if largest == root:
+            return
+        a, b = lo + root, lo + largest
+        arr[a], arr[b] = arr[b], arr[a]
+        yield trace.step((a, b), swapping=[a, b])
+        root = largest
+
+
+def _heap_sort_range_steps(arr, trace, lo, hi):
+    """Heap sort arr[lo..hi], marking each element sorted as it reaches its place"""
+    size = hi - lo + 1
+    for root in range(size // 2 - 1, -1, -1):
+        yield from _sift_down_steps(arr, trace, lo, root, size)
+
+    for end in range(size - 1, 0, -1):
+        a, b = lo, lo + end
+        arr[a], arr[b] = arr[b], arr[a]
+        trace.mark_sorted(b, b)
+        yield trace.step((a, b), swapping=[a, b])
+        yield from _sift_down_steps(arr, trace, lo, 0, end)
+    if size > 0:
+        trace.mark_sorted(lo, lo)
+
+
+def heap_sort_steps(arr, trace_format='full', **trace_options):
+    arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+
+    yield from _heap_sort_range_steps(arr_copy, trace, 0, len(arr_copy) - 1)
+
+    trace.mark_sorted(0, len(arr_copy) - 1)
+    yield trace.step(complete=True)
+
+
+# ============ SHELL SORT ============
+
+# Ciura's gap sequence, extended by a factor of 2.25 for large arrays
+SHELL_GAPS = [1, 4, 10, 23, 57, 132, 301, 701]
+
+
+def shell_gaps(n):
+    gaps = list(SHELL_GAPS)
+    while gaps[-1] * 2.25 < n:
+        gaps.append(int(gaps[-1] * 2.25))
+    return [gap for gap in reversed(gaps) if gap < n]
+
+
+def shell_sort_steps(arr, trace_format='full', **trace_options):
+    arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+    n = len(arr_copy)
+
+    for gap in shell_gaps(n):
+        # Gapped insertion sort
+        for i in range(gap, n):
+            key = arr_copy[i]
+            j = i
+            yield trace.step(comparing=[j - gap, j])
+
+            while j >= gap and arr_copy[j - gap] > key:
+                arr_copy[j] = arr_copy[j - gap]
+                yield trace.step((j,), swapping=[j - gap, j])
+                j -= gap
+
+            if j != i:
+                arr_copy[j] = key
+                yield trace.step((j,), inserting=j)
+
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(complete=True)
+
+
+# ============ COUNTING AND RADIX SORT ============
+# Integer keys only; negative values are handled by offsetting by the minimum
+
+# Largest max - min counting sort allocates counts for
+MAX_COUNTING_RANGE = 10 ** 6
+
+RADIX_BASE = 10
+
+
+def counting_sort_steps(arr, trace_format='full', **trace_options):
+    arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+    n = len(arr_copy)
+
+    if n:
+        low = min(arr_copy)
+        counts = [0] * (max(arr_copy) - low + 1)
+        for i in range(n):
+            yield trace.step(comparing=[i])
+            counts[arr_copy[i] - low] += 1
+
+        k = 0
+        for offset, count in enumerate(counts):
+            for _ in range(count):
+                arr_copy[k] = low + offset
+                trace.mark_sorted(k, k)
+                yield trace.step((k,), inserting=k)
+                k += 1
+
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(complete=True)
+
+
+def radix_sort_steps(arr, trace_format='full', **trace_options):
+    """LSD radix sort: one stable counting pass per base-10 digit"""
+    arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+    n = len(arr_copy)
+
+    if n:
+        low = min(arr_copy)
+        span = max(arr_copy) - low
+        place = 1
+        while True:
+            buckets = [[] for _ in range(RADIX_BASE)]
+            for i in range(n):
+                yield trace.step(comparing=[i])
+                buckets[(arr_copy[i] - low) // place % RADIX_BASE].append(arr_copy[i])
+
+            k = 0
+            for bucket in buckets:
+                for value in bucket:
+                    if arr_copy[k] != value:
+                        arr_copy[k] = value
+                        yield trace.step((k,), inserting=k)
+                    k += 1
+
+            place *= RADIX_BASE
+            if place > span:
+                break
+
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(complete=True)
+
+
+# ============ BOTTOM-UP MERGE SORT ============
+
+def bottom_up_merge_sort_steps(arr, trace_format='full', **trace_options):
+    """Iterative merge sort: merges runs of width 1, 2, 4, ... with no recursion"""
+    arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+    n = len(arr_copy)
+
+    width = 1
+    while width < n:
+        for left in range(0, n - width, 2 * width):
+            mid = left + width - 1
+            right = min(left + 2 * width - 1, n - 1)
+            yield from _merge_steps(arr_copy, trace, left, mid, right)
+        width *= 2
+
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(complete=True)
+
+
+# ============ INTROSORT ============
+
+# Ranges up to this size are finished with insertion sort
+INTRO_INSERTION_SIZE = 16
+
+
+def _insertion_range_steps(arr, trace, lo, hi):
+    for i in range(lo + 1, hi + 1):
+        key = arr[i]
+        j = i - 1
+        yield trace.step(comparing=[j, i])
+
+        while j >= lo and arr[j] > key:
+            arr[j + 1] = arr[j]
+            yield trace.step((j + 1,), swapping=[j, j + 1])
+            j -= 1
+
+        arr[j + 1] = key
+        yield trace.step((j + 1,), inserting=j + 1)
+
+
+def intro_sort_steps(arr, trace_format='full', **trace_options):
+    """
+    Quick sort with a median-of-three pivot, an explicit stack instead of
+    recursion, heap sort for ranges that exceed 2*log2(n) partitioning levels
+    and insertion sort for small ranges
+    """
+    arr_copy = arr.copy()
+    trace = new_trace(arr_copy, trace_format, **trace_options)
+    n = len(arr_copy)
+
+    stack = [(0, n - 1, 2 * max(n, 1).bit_length())]
+    while stack:
+        low, high, depth = stack.pop()
+        if high - low + 1 <= INTRO_INSERTION_SIZE:
+            if low <= high:
+                yield from _insertion_range_steps(arr_copy, trace, low, high)
+                trace.mark_sorted(low, high)
+            continue
+        if depth == 0:
+            yield from _heap_sort_range_steps(arr_copy, trace, low, high)
+            continue
+
+        # Move the median of the first, middle and last elements to the end
+        mid = (low + high) // 2
+        yield trace.step(comparing=[low, mid, high], range=[low, high])
+        candidates = sorted((low, mid, high), key=lambda k: arr_copy[k])
+        median = candidates[1]
+        if median != high:
+            arr_copy[median], arr_copy[high] = arr_copy[high], arr_copy[median]
+            yield trace.step((median, high), swapping=[median, high])
+
+        pi = yield from _partition_steps(arr_copy, trace, low, high)
+        trace.mark_sorted(pi, pi)
+
+        # Smaller side on top of the stack, so the stack stays O(log n) deep
+        sides = sorted([(low, pi - 1), (pi + 1, high)], key=lambda side: side[1] - side[0], reverse=True)
+        for side_low, side_high in sides:
+            stack.append((side_low, side_high, depth - 1))
+
+    trace.mark_sorted(0, n - 1)
+    yield trace.step(complete=True)
+
+
+# ============ STEP LISTS ============
+# Eager versions of the generators above, returning the whole trace at once
+
+def bubble_sort(arr, trace_format='full', **trace_options):
+    return list(bubble_sort_steps(arr, trace_format, **trace_options))
+
+def quick_sort(arr, trace_format='full', **trace_options):
+    return list(quick_sort_steps(arr, trace_format, **trace_options))
+
+def merge_sort(arr, trace_format='full', **trace_options):
+    return list(merge_sort_steps(arr, trace_format, **trace_options))
+
+def insertion_sort(arr, trace_format='full', **trace_options):
+    return list(insertion_sort_steps(arr, trace_format, **trace_options))
+
+def selection_sort(arr, trace_format='full', **trace_options):
+    return list(selection_sort_steps(arr, trace_format, **trace_options))
+
+def heap_sort(arr, trace_format='full', **trace_options):
+    return list(heap_sort_steps(arr, trace_format, **trace_options))
+
+def shell_sort(arr, trace_format='full', **trace_options):
+    return list(shell_sort_steps(arr, trace_format, **trace_options))
+
+def counting_sort(arr, trace_format='full', **trace_options):
+    return list(counting_sort_steps(arr, trace_format, **trace_options))
+
+def radix_sort(arr, trace_format='full', **trace_options):
+    return list(radix_sort_steps(arr, trace_format, **trace_options))
+
+def bottom_up_merge_sort(arr, trace_format='full', **trace_options):
+    return list(bottom_up_merge_sort_steps(arr, trace_format, **trace_options))
+
+def intro_sort(arr, trace_format='full', **trace_options):
+    return list(intro_sort_steps(arr, trace_format, **trace_options))
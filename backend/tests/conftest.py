@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Backend modules import each other as top-level modules (`import binary`),
+# the same way app.py is run from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
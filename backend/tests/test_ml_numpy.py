@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import ml_common
+import ml_numpy
+
+torch = pytest.importorskip('torch')
+import ML  # noqa: E402
+
+# ============ TORCH PARITY ============
+# Started from the same weights, the NumPy backend follows the same training
+# trajectory as torch: float32 rounding differences stay far below anything
+# the frontend shows, and every prediction is identical.
+
+EPOCHS = 1000
+
+
+def torch_init_weights(problem_type, seed):
+    """The initial weights ML.train_neural_network draws after torch.manual_seed(seed)"""
+    torch.manual_seed(seed)
+    model = ML.LinearClassifier() if problem_type == 'linear' else ML.MLPClassifier(hidden_size=16)
+    return {name: value.numpy().copy() for name, value in model.state_dict().items()}
+
+
+@pytest.mark.parametrize('problem_type', ['linear', 'xor', 'circle'])
+def test_numpy_training_matches_torch(problem_type):
+    X, y = ml_common.generate_classification_data(problem_type)
+    init_weights = torch_init_weights(problem_type, seed=0)
+
+    torch.manual_seed(0)
+    expected = ML.train_neural_network(X, y, problem_type, max_epochs=EPOCHS, snapshot_interval=1, columnar=True)
+    actual = ml_numpy.train_neural_network(X, y, problem_type, max_epochs=EPOCHS, snapshot_interval=1,
+                                           columnar=True, init_weights=init_weights)
+
+    assert actual['epochs'] == expected['epochs']
+    assert actual['predictions'] == expected['predictions']
+    np.testing.assert_allclose(actual['loss'], expected['loss'], rtol=0, atol=1e-5)
+    np.testing.assert_allclose(actual['accuracy'], expected['accuracy'], rtol=0, atol=1e-6)
+    for name, history in expected['weights'].items():
+        np.testing.assert_allclose(actual['weights'][name], history, rtol=0, atol=1e-4)
+
+
+def test_shared_helpers_do_not_import_torch():
+    code = 'import sys, ml_common, ml_numpy; sys.exit("torch" in sys.modules)'
+    assert subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(ml_common.__file__)).returncode == 0
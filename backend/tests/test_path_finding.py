@@ -0,0 +1,127 @@
+import hashlib
+import json
+
+import pytest
+
+import path_finding
+
+# ============ PINNED TRACES ============
+# Fingerprints of the full-format steps each search emits on seeded mazes.
+# A change here means clients see different steps for the same request.
+# Dijkstra and A* are pinned as their bucket queue orders ties (on these
+# 0/1 mazes Dijkstra's steps are exactly BFS's). The Python engine lists
+# visited cells from a set, so fingerprints sort them; expansion order
+# ('current'), path and completion are pinned as emitted.
+
+# (seed, rows, cols); start is the top-left corner and end the bottom-right
+MAZES = [(1, 20, 25), (4, 15, 25), (6, 25, 20), (8, 15, 30), (14, 25, 30)]
+
+PINNED = {
+    ('dijkstra', 1): '4eb39322b89aac88',
+    ('dijkstra', 4): 'a6b5e75d25205780',
+    ('dijkstra', 6): '856595422db1f428',
+    ('dijkstra', 8): 'abdb1df740cf8357',
+    ('dijkstra', 14): 'fda89814363509b2',
+    ('astar', 1): '2c8852a2ffbb9908',
+    ('astar', 4): '1d35e8e3f9b9ccbd',
+    ('astar', 6): '01ae4ab28840ba57',
+    ('astar', 8): 'b0f8ed77ea5ddd9c',
+    ('astar', 14): '282d1231844e5e97',
+    ('bfs', 1): '4eb39322b89aac88',
+    ('bfs', 4): 'a6b5e75d25205780',
+    ('bfs', 6): '856595422db1f428',
+    ('bfs', 8): 'abdb1df740cf8357',
+    ('bfs', 14): 'fda89814363509b2',
+    ('dfs', 1): '571786fef08f4e5c',
+    ('dfs', 4): '74ed9e75f5d13009',
+    ('dfs', 6): '1a1b8077a6a31e5e',
+    ('dfs', 8): '3dfecb7279d0e393',
+    ('dfs', 14): '1c79695eecf44d5f',
+}
+
+ENGINES = {
+    'python': {
+        'dijkstra': path_finding.dijkstra_steps,
+        'astar': path_finding.a_star_steps,
+        'bfs': path_finding.bfs_steps,
+        'dfs': path_finding.dfs_steps
+    },
+    'numpy': {
+        'dijkstra': path_finding.dijkstra_array_steps,
+        'astar': path_finding.a_star_array_steps,
+        'bfs': path_finding.bfs_array_steps,
+        'dfs': path_finding.dfs_array_steps
+    }
+}
+
+
+def fingerprint(steps):
+    canonical = [
+        [step['current'], sorted(step['visited']), step['path'], step.get('complete', False)]
+        for step in json.loads(json.dumps(steps))
+    ]
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()[:16]
+
+
+def run(engine, algorithm, seed, rows, cols, trace_format='full'):
+    grid = path_finding.generate_maze_array(rows, cols, seed=seed)
+    maze = grid.tolist() if engine == 'python' else grid
+    func = ENGINES[engine][algorithm]
+    return list(func(maze, (0, 0), (rows - 1, cols - 1), trace_format))
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize('algorithm', ['dijkstra', 'astar', 'bfs', 'dfs'])
+@pytest.mark.parametrize('seed, rows, cols', MAZES)
+def test_steps_match_pinned_traces(engine, algorithm, seed, rows, cols):
+    steps = run(engine, algorithm, seed, rows, cols)
+    assert steps[-1].get('complete')
+    assert fingerprint(steps) == PINNED[algorithm, seed]
+
+
+@pytest.mark.parametrize('algorithm', ['dijkstra', 'astar', 'bfs', 'dfs'])
+@pytest.mark.parametrize('seed, rows, cols', MAZES)
+def test_engines_emit_same_delta_steps(algorithm, seed, rows, cols):
+    assert run('python', algorithm, seed, rows, cols, 'delta') == run('numpy', algorithm, seed, rows, cols, 'delta')
+
+
+@pytest.mark.parametrize('algorithm', ['dijkstra', 'astar', 'bfs', 'dfs'])
+def test_delta_steps_expand_to_full_steps(algorithm):
+    seed, rows, cols = MAZES[0]
+    full = run('numpy', algorithm, seed, rows, cols)
+    delta = run('numpy', algorithm, seed, rows, cols, 'delta')
+    assert json.loads(json.dumps(list(path_finding.expand_delta(delta)))) == json.loads(json.dumps(full))
+
+
+# ============ MAZE INPUT ============
+
+ALL_ALGORITHMS = {
+    'python': [
+        path_finding.dijkstra_steps, path_finding.a_star_steps, path_finding.bfs_steps, path_finding.dfs_steps,
+        path_finding.bidirectional_bfs_steps, path_finding.bidirectional_a_star_steps, path_finding.jps_steps
+    ],
+    'numpy': [
+        path_finding.dijkstra_array_steps, path_finding.a_star_array_steps, path_finding.bfs_array_steps,
+        path_finding.dfs_array_steps, path_finding.bidirectional_bfs_array_steps,
+        path_finding.bidirectional_a_star_array_steps, path_finding.jps_array_steps
+    ]
+}
+
+
+@pytest.mark.parametrize('func', ALL_ALGORITHMS['python'], ids=lambda func: func.__name__)
+def test_python_engine_takes_a_grid_and_never_writes_to_its_maze(func):
+    grid = path_finding.generate_maze_array(12, 14, seed=3)
+    grid[0, 0] = grid[11, 13] = 1  # Walls under start and end count as open
+    maze = grid.tolist()
+    expected = json.dumps(list(func(maze, (0, 0), (11, 13), 'delta')))
+    assert maze == grid.tolist()
+    assert json.dumps(list(func(path_finding.Grid.from_array(grid), (0, 0), (11, 13), 'delta'))) == expected
+
+
+@pytest.mark.parametrize('engine', sorted(ALL_ALGORITHMS))
+@pytest.mark.parametrize('start, end', [((0, 0), (0, 5)), ((-1, 0), (2, 2)), ((0, 0), (3, 0))])
+def test_cells_outside_the_maze_are_rejected(engine, start, end):
+    grid = path_finding.Grid.from_array(path_finding.generate_maze_array(3, 3, seed=0, density=0))
+    for func in ALL_ALGORITHMS[engine]:
+        with pytest.raises(ValueError):
+            list(func(grid if engine == 'numpy' else grid.tolist(), start, end))
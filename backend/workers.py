@@ -0,0 +1,301 @@
+import importlib
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import binary
+import sessions
+
+# ============ JOBS ============
+# Top-level functions so they can be pickled to worker processes. Each one
+# returns the encoded body (JSON, or binary.py's format): shipping bytes back
+# is far cheaper than pickling millions of step dicts.
+
+def encode(payload, body_format='json'):
+    if body_format == 'binary':
+        return binary.encode(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+def ndjson_lines(meta, steps):
+    """A trace as newline-delimited JSON: `meta` (every response field except 'steps'), then one line per step"""
+    yield json.dumps(meta) + '\n'
+    for step in steps:
+        yield json.dumps(step) + '\n'
+
+def _sort_steps(func, array, trace_format, trace_options, max_steps, meta):
+    """A sort's steps, or with `max_steps` a sample of them (adding its totals to `meta`)"""
+    import sorting
+
+    if max_steps:
+        sampler = sorting.StepSampler(max_steps)
+        steps = sampler.collect(func(array, trace_format, sampler=sampler, **trace_options))
+        meta.update({'total_steps': sampler.count, 'stride': sampler.stride})
+        return steps
+    return func(array, trace_format, **trace_options)
+
+def sort_job(func, array, trace_format, trace_options, max_steps, meta, body_format='json'):
+    steps = list(_sort_steps(func, array, trace_format, trace_options, max_steps, meta))
+    return encode({'steps': steps, **meta}, body_format)
+
+def sort_stream_job(func, array, trace_format, trace_options, max_steps, meta):
+    """sort_job as NDJSON lines, for WorkerPool.stream"""
+    return ndjson_lines(meta, _sort_steps(func, array, trace_format, trace_options, max_steps, meta))
+
+def pathfinding_job(func, maze, start, end, trace_format, trace_options, meta, body_format='json'):
+    steps = list(func(maze, start, end, trace_format, **trace_options))
+    return encode({'steps': steps, **meta}, body_format)
+
+def pathfinding_stream_job(func, maze, start, end, trace_format, trace_options, meta):
+    """pathfinding_job as NDJSON lines, for WorkerPool.stream"""
+    return ndjson_lines(meta, func(maze, start, end, trace_format, **trace_options))
+
+def compare_job(func, grid, start, end, trace_format, trace_options, include_steps):
+    """
+    One algorithm of a comparison: its metrics and, if `include_steps`, its
+    trace. `grid` is a path_finding.Grid shared by every run, whichever the
+    engine.
+    """
+    if not include_steps:
+        # Full steps copy the visited list every time; deltas cost the same to count
+        trace_format, trace_options = 'delta', {}
+    started = time.perf_counter()
+    steps = list(func(grid, start, end, trace_format, **trace_options))
+    wall_time = time.perf_counter() - started
+
+    found = bool(steps) and bool(steps[-1].get('complete'))
+    result = {
+        'nodes_expanded': len(steps) - found,
+        'path_length': len(steps[-1]['path']) - 1 if found else None,
+        'wall_time': wall_time
+    }
+    if include_steps:
+        result['steps'] = steps
+    return encode(result)
+
+# Training backend name -> module implementing train_neural_network
+ML_BACKENDS = {
+    'torch': 'ML',
+    'numpy': 'ml_numpy'
+}
+
+def record_job(func, args):
+    """Record a run as a compressed delta log for a trace session: (step count, segments)"""
+    steps = func(*args, 'delta', keyframe_interval=sessions.KEYFRAME_INTERVAL)
+    return sessions.record(steps, sessions.KEYFRAME_INTERVAL)
+
+def ml_train_job(X, y, problem_type, train_options, meta, backend='torch', body_format='json'):
+    module = importlib.import_module(ML_BACKENDS[backend])
+
+    summary = {}
+    steps = module.train_neural_network(X, y, problem_type, summary=summary, **train_options)
+    meta.update(summary)
+    if train_options.get('columnar'):
+        return encode({'snapshots': steps, 'format': 'columnar', **meta}, body_format)
+    return encode({'steps': steps, **meta}, body_format)
+
+def ml_ensemble_job(X, y, problem_type, configs, train_options, meta, body_format='json'):
+    import ML
+
+    runs = ML.train_ensemble(X, y, problem_type, configs, **train_options)
+    key = 'snapshots' if train_options.get('columnar') else 'steps'
+    models = [{'config': config, key: run} for config, run in zip(configs, runs)]
+    if train_options.get('columnar'):
+        return encode({'models': models, 'format': 'columnar', **meta}, body_format)
+    return encode({'models': models, **meta}, body_format)
+
+def _warm_worker(modules):
+    # Pay for the heavy imports (torch in particular) once per worker,
+    # at startup, instead of inside the first request it serves
+    for module in modules:
+        importlib.import_module(module)
+
+def _noop():
+    return None
+
+def _stream_job(func, args, channel, deadline):
+    """
+    Runs in a worker: put the str chunks func(*args) yields on `channel` in
+    batches, then None once done. Gives up (JobTimeout) at `deadline`,
+    including when the consumer stops reading and the channel stays full.
+    """
+    batch = []
+    size = 0
+    flushed = None
+
+    def put(item):
+        try:
+            channel.put(item, timeout=max(0, deadline - time.time()))
+        except queue.Full:
+            raise JobTimeout() from None
+
+    try:
+        for chunk in func(*args):
+            if time.time() > deadline:
+                raise JobTimeout()
+            batch.append(chunk)
+            size += len(chunk)
+            # The first chunk goes out at once, so the response starts promptly
+            now = time.monotonic()
+            if flushed is None or size >= STREAM_BATCH_BYTES or now - flushed >= STREAM_BATCH_SECONDS:
+                put(''.join(batch))
+                batch = []
+                size = 0
+                flushed = now
+        if batch:
+            put(''.join(batch))
+    finally:
+        try:
+            channel.put(None, timeout=max(0, deadline - time.time()))
+        except queue.Full:
+            pass
+
+def _forward(future, channel, deadline):
+    """Yield a streaming job's batches as they arrive, raising its error or JobTimeout"""
+    try:
+        while True:
+            try:
+                batch = channel.get(timeout=max(0, deadline - time.time()))
+            except queue.Empty:
+                raise JobTimeout() from None
+            if batch is None:
+                break
+            yield batch
+        future.result(timeout=max(0, deadline - time.time()))
+    except TimeoutError:
+        raise JobTimeout() from None
+    finally:
+        future.cancel()
+
+# ============ POOL ============
+
+class PoolBusy(Exception):
+    """Raised when the pool already has max_pending jobs queued or running"""
+
+class JobTimeout(Exception):
+    """Raised when a job does not finish within the pool's timeout"""
+
+# Streamed chunks cross from a worker in batches of about this many bytes,
+# or whatever STREAM_BATCH_SECONDS produced; at most STREAM_QUEUE_BATCHES
+# wait unread before the worker stalls (a slow or gone client)
+STREAM_BATCH_BYTES = 64 * 1024
+STREAM_BATCH_SECONDS = 0.05
+STREAM_QUEUE_BATCHES = 16
+
+class WorkerPool:
+    """
+    Runs jobs in a pool of worker processes so CPU-bound algorithm runs use
+    every core and never hold the GIL of the web server.
+
+    With workers=0 jobs run inline in the calling thread (no limits apply
+    besides the input-size checks done by the caller). `preload` names the
+    modules every worker imports when it starts.
+    A job that times out keeps its worker busy until it finishes, and keeps
+    counting towards max_pending until then.
+    """
+    def __init__(self, workers=0, max_pending=None, timeout=60, preload=()):
+        self.workers = workers
+        self.preload = tuple(preload)
+        self.max_pending = max_pending or 2 * workers
+        self.timeout = timeout
+        self.executor = None
+        self.context = None
+        self.manager = None
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max(1, self.max_pending))
+
+    def start(self):
+        if self.workers <= 0 or self.executor:
+            return
+        context = None
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        self.context = context
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_warm_worker, initargs=(self.preload,)
+        )
+        # Processes are spawned lazily; force all of them up (and warm) now
+        futures = [self.executor.submit(_noop) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def _submit(self, func, args, wait=None):
+        """Submit a job once a slot is free, waiting up to `wait` seconds (None: not at all)"""
+        if wait is None:
+            acquired = self.slots.acquire(blocking=False)
+        else:
+            acquired = self.slots.acquire(timeout=max(0, wait))
+        if not acquired:
+            raise PoolBusy() if wait is None else JobTimeout()
+        try:
+            future = self.executor.submit(func, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def run(self, func, *args):
+        if not self.executor:
+            return func(*args)
+
+        future = self._submit(func, args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise JobTimeout()
+
+    def stream(self, func, *args):
+        """
+        Run a job that yields str chunks (func(*args) returns an iterator)
+        and return an iterator over them as they arrive, batched. Like run()
+        it takes a slot, raising PoolBusy at once if none is free; the
+        iterator raises JobTimeout once the whole run exceeds the timeout.
+        """
+        if not self.executor:
+            return func(*args)
+
+        with self.lock:
+            # Queues a worker can write to must go through a manager process
+            if self.manager is None:
+                self.manager = (self.context or multiprocessing).Manager()
+            channel = self.manager.Queue(STREAM_QUEUE_BATCHES)
+        deadline = time.time() + self.timeout
+        future = self._submit(_stream_job, (func, args, channel, deadline))
+        return _forward(future, channel, deadline)
+
+    def run_all(self, jobs):
+        """
+        Run (func, args) jobs side by side and return their results in order.
+        Only the first job needs a free slot right away; the others wait for
+        one (this request's earlier jobs free them). The timeout covers the
+        whole batch.
+        """
+        if not self.executor:
+            return [func(*args) for func, args in jobs]
+
+        deadline = time.monotonic() + self.timeout
+        futures = []
+        try:
+            for func, args in jobs:
+                wait = deadline - time.monotonic() if futures else None
+                futures.append(self._submit(func, args, wait))
+            return [future.result(timeout=max(0, deadline - time.monotonic())) for future in futures]
+        except (PoolBusy, JobTimeout, TimeoutError):
+            for future in futures:
+                future.cancel()
+            if futures:
+                raise JobTimeout()
+            raise
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        if self.manager:
+            self.manager.shutdown()
+            self.manager = None
@@ -1,6 +1,10 @@
+import { BINARY_MIMETYPE, readBody } from './binary.js';
 import { playBeep } from './sound.js';
 import { state } from './state.js';
 
+// Grid size of the decision-boundary heatmaps computed by the server
+const BOUNDARY_RESOLUTION = 50;
+
 // Load and display data when problem type changes
 export async function loadMLData() {
     const problem = document.getElementById('mlProblem').value;
@@ -40,15 +44,16 @@ export async function startMLTraining() {
     try {
         const response = await fetch(`${state.API_URL}/ml-train`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'Accept': BINARY_MIMETYPE },
             body: JSON.stringify({
                 X: state.mlData.X,
                 y: state.mlData.y,
-                problem_type: problem
+                problem_type: problem,
+                boundary_resolution: BOUNDARY_RESOLUTION
             })
         });
         
-        const data = await response.json();
+        const data = await readBody(response);
         await animateMLTraining(data.steps);
     } catch (error) {
         console.error('Error:', error);
@@ -108,8 +113,11 @@ export function renderMLVisualization(step) {
         return canvas.height - padding - ((y - minY) / (maxY - minY)) * height;
     }
     
-    // Draw decision boundary ONLY if we have weights (during/after training)
-    if (step && step.weights) {
+    // Draw decision boundary ONLY if we have weights (during/after training),
+    // preferring the heatmap the server already evaluated
+    if (step && step.boundary) {
+        drawBoundaryHeatmap(ctx, decodeHeatmap(step.boundary), minX, maxX, minY, maxY, scaleX, scaleY, width, height);
+    } else if (step && step.weights) {
         drawDecisionBoundary(ctx, step.weights, minX, maxX, minY, maxY, scaleX, scaleY, width, height);
     }
     
@@ -180,16 +188,7 @@ function drawDecisionBoundary(ctx, weights, minX, maxX, minY, maxY, scaleX, scal
             const y = minY + j * stepY;
             
             const prediction = evaluateNetwork(x, y, weights, state.mlProblemType);
-            
-            // Color each pixel based on what the network predicts
-            // prediction > 0.5 = class 1 (red), prediction < 0.5 = class 0 (blue)
-            if (prediction > 0.5) {
-                const confidence = (prediction - 0.5) * 2; // 0 to 1
-                ctx.fillStyle = `rgba(239, 68, 68, ${0.2 + confidence * 0.3})`; // Red with varying opacity
-            } else {
-                const confidence = (0.5 - prediction) * 2; // 0 to 1
-                ctx.fillStyle = `rgba(59, 130, 246, ${0.2 + confidence * 0.3})`; // Blue with varying opacity
-            }
+            ctx.fillStyle = predictionColor(prediction);
             
             const pixelWidth = Math.ceil(width / resolution);
             const pixelHeight = Math.ceil(height / resolution);
@@ -198,6 +197,37 @@ function drawDecisionBoundary(ctx, weights, minX, maxX, minY, maxY, scaleX, scal
     }
 }
 
+// Color each pixel based on what the network predicts
+// prediction > 0.5 = class 1 (red), prediction < 0.5 = class 0 (blue)
+function predictionColor(prediction) {
+    if (prediction > 0.5) {
+        const confidence = (prediction - 0.5) * 2; // 0 to 1
+        return `rgba(239, 68, 68, ${0.2 + confidence * 0.3})`; // Red with varying opacity
+    }
+    const confidence = (0.5 - prediction) * 2; // 0 to 1
+    return `rgba(59, 130, 246, ${0.2 + confidence * 0.3})`; // Blue with varying opacity
+}
+
+// Heatmaps arrive as base64 uint8 probabilities (0-255), row-major with y as the row
+function decodeHeatmap(encoded) {
+    return Uint8Array.from(atob(encoded), c => c.charCodeAt(0));
+}
+
+function drawBoundaryHeatmap(ctx, heatmap, minX, maxX, minY, maxY, scaleX, scaleY, width, height) {
+    const resolution = Math.round(Math.sqrt(heatmap.length));
+    const stepX = (maxX - minX) / resolution;
+    const stepY = (maxY - minY) / resolution;
+    const pixelWidth = Math.ceil(width / resolution);
+    const pixelHeight = Math.ceil(height / resolution);
+    
+    for (let j = 0; j < resolution; j++) {
+        for (let i = 0; i < resolution; i++) {
+            ctx.fillStyle = predictionColor(heatmap[j * resolution + i] / 255);
+            ctx.fillRect(scaleX(minX + i * stepX), scaleY(minY + j * stepY), pixelWidth, pixelHeight);
+        }
+    }
+}
+
 function evaluateNetwork(x, y, weights, problemType) {
     if (problemType === 'linear') {
         // Linear classifier: sigmoid(w * x + b)
@@ -0,0 +1,74 @@
+// Decoder for the server's binary response format (see backend/binary.py),
+// producing the same objects JSON.parse would for the equivalent JSON body
+
+export const BINARY_MIMETYPE = 'application/x-algoviz-binary';
+
+const TYPED_ARRAYS = {
+    uint8: Uint8Array,
+    uint16: Uint16Array,
+    uint32: Uint32Array,
+    int32: Int32Array,
+    float32: Float32Array,
+    float64: Float64Array
+};
+
+export function decodeBinary(arrayBuffer) {
+    const view = new DataView(arrayBuffer);
+    const magic = String.fromCharCode(...new Uint8Array(arrayBuffer, 0, 4));
+    if (magic !== 'AVB1') throw new Error('Not an AlgoViz binary response');
+
+    const headerLength = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(arrayBuffer, 8, headerLength)));
+    const dataStart = Math.ceil((8 + headerLength) / 8) * 8;
+
+    const buffers = header.buffers.map(({ type, offset, length }) => {
+        if (type === 'bits') return new Uint8Array(arrayBuffer, dataStart + offset, length);
+        return new TYPED_ARRAYS[type](arrayBuffer, dataStart + offset, length);
+    });
+
+    // Flat values of one reference, as a plain array
+    function values(ref) {
+        const [index, offset, ...shape] = ref;
+        const count = shape.reduce((a, b) => a * b, 1);
+        const buffer = buffers[index];
+        if (header.buffers[index].type !== 'bits') {
+            return Array.from(buffer.subarray(offset, offset + count));
+        }
+        const flat = new Array(count);
+        for (let i = 0; i < count; i++) {
+            flat[i] = (buffer[offset + (i >> 3)] >> (7 - (i & 7))) & 1;
+        }
+        return flat;
+    }
+
+    // Nests a flat array back into the given shape
+    function reshape(flat, shape, start = 0) {
+        if (shape.length === 1) return flat.slice(start, start + shape[0]);
+        const stride = shape.slice(1).reduce((a, b) => a * b, 1);
+        const rows = new Array(shape[0]);
+        for (let i = 0; i < shape[0]; i++) {
+            rows[i] = reshape(flat, shape.slice(1), start + i * stride);
+        }
+        return rows;
+    }
+
+    function unpack(value) {
+        if (Array.isArray(value)) return value.map(unpack);
+        if (value === null || typeof value !== 'object') return value;
+        if ('$' in value) return reshape(values(value.$), value.$.slice(2));
+        const result = {};
+        for (const key in value) result[key] = unpack(value[key]);
+        return result;
+    }
+
+    return unpack(header.body);
+}
+
+// Parses a response body in whichever format the server chose
+export async function readBody(response) {
+    const contentType = response.headers.get('Content-Type') || '';
+    if (contentType.startsWith(BINARY_MIMETYPE)) {
+        return decodeBinary(await response.arrayBuffer());
+    }
+    return response.json();
+}
@@ -1,18 +1,22 @@
 import { playBeep } from "./sound.js";
 import { state } from "./state.js";
+import { readTrace } from "./stream.js";
 
 export function generateNewMaze() {
     const rows = 20;
     const cols = 25;
+    const generator = document.getElementById('mazeGenerator').value;
     
     fetch(`${state.API_URL}/pathfinding`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ rows, cols })
+        body: JSON.stringify({ rows, cols, generator, connected: true })
     })
     .then(res => res.json())
     .then(data => {
         state.currentMaze = data.maze;
+        // Later runs name this maze instead of posting it, until it is edited
+        state.mazeRef = data.maze_ref;
         state.mazeStart = [0, 0];
         state.mazeEnd = [rows - 1, cols - 1];
         renderMaze();
@@ -27,10 +31,12 @@ export function clearMaze() {
     if (!state.currentMaze.length) return;
     
     state.currentMaze = state.currentMaze.map(row => row.map(() => 0));
+    state.mazeRef = null;
     renderMaze();
 }
 
-function renderMaze(visited = [], current = null, path = []) {
+// `endSide` holds "r,c" keys of cells a bidirectional search expanded from the end
+function renderMaze(visited = [], current = null, path = [], endSide = new Set()) {
     const container = document.getElementById('mazeContainer');
     container.innerHTML = '';
     
@@ -48,6 +54,10 @@ function renderMaze(visited = [], current = null, path = []) {
             
             if (cell === 1) {
                 cellDiv.classList.add('wall');
+            } else if (cell > 1) {
+                // Terrain cost 2-9, shaded by cost
+                cellDiv.classList.add('terrain');
+                cellDiv.style.setProperty('--cost', cell);
             }
             
             if (state.mazeStart && state.mazeStart[0] === r && state.mazeStart[1] === c) {
@@ -60,6 +70,7 @@ function renderMaze(visited = [], current = null, path = []) {
                 cellDiv.classList.add('current');
             } else if (visited.some(v => v[0] === r && v[1] === c)) {
                 cellDiv.classList.add('visited');
+                if (endSide.has(`${r},${c}`)) cellDiv.classList.add('visited-end');
             }
             
             cellDiv.addEventListener('click', () => toggleCell(r, c));
@@ -83,7 +94,8 @@ function toggleCell(r, c) {
         } else if (state.mazeEnd[0] === r && state.mazeEnd[1] === c) {
             state.mazeEnd = null;
         } else {
-            state.currentMaze[r][c] = state.currentMaze[r][c] === 0 ? 1 : 0;
+            state.currentMaze[r][c] = state.currentMaze[r][c] === 1 ? 0 : 1;
+            state.mazeRef = null;
         }
     }
     
@@ -97,6 +109,8 @@ export async function startPathfinding() {
     }
     
     const algo = document.getElementById('pathAlgo').value;
+    // Only Dijkstra and A* support 8-connected moves
+    const diagonal = document.getElementById('pathDiagonal').checked && ['dijkstra', 'astar'].includes(algo);
     const btn = document.getElementById('pathBtn');
     btn.disabled = true;
     state.isAnimating = true;
@@ -106,15 +120,17 @@ export async function startPathfinding() {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
-                maze: state.currentMaze,
+                ...(state.mazeRef || { maze: state.currentMaze }),
                 start: state.mazeStart,
                 end: state.mazeEnd,
-                algorithm: algo
+                algorithm: algo,
+                diagonal,
+                stream: true
             })
         });
         
-        const data = await response.json();
-        await animatePathfinding(data.steps);
+        const { steps } = await readTrace(response);
+        await animatePathfinding(steps);
     } catch (error) {
         console.error('Error:', error);
         alert('Error connecting to backend. Make sure the Python server is running on ' + state.API_URL.split('/api')[0] + '.');
@@ -126,11 +142,13 @@ export async function startPathfinding() {
 
 async function animatePathfinding(steps) {
     const speed = document.getElementById('pathSpeed').value;
+    const endSide = new Set();
     
-    for (let step of steps) {
+    for await (let step of steps) {
         if (!state.isAnimating) break;
         
-        renderMaze(step.visited, step.current, step.path);
+        if (step.side === 'end') endSide.add(`${step.current[0]},${step.current[1]}`);
+        renderMaze(step.visited, step.current, step.path, endSide);
 
         // Play sound for visiting cells
         if (step.current) {
@@ -1,5 +1,6 @@
 import { playBeep } from "./sound.js";
 import { state } from "./state.js";
+import { readTrace } from "./stream.js";
 
 export function generateNewArray() {
     state.currentArray = [];
@@ -9,7 +10,11 @@ export function generateNewArray() {
     renderBars(state.currentArray);
 }
 
+// `sorted` lists inclusive [lo, hi] runs (the server's 'runs' sorted_format)
 export function renderBars(arr, comparing = [], swapping = [], sorted = []) {
+    const isSorted = new Uint8Array(arr.length);
+    for (const [lo, hi] of sorted) isSorted.fill(1, lo, hi + 1);
+
     const container = document.getElementById('barsContainer');
     container.innerHTML = '';
     
@@ -20,7 +25,7 @@ export function renderBars(arr, comparing = [], swapping = [], sorted = []) {
         bar.className = 'bar';
         bar.style.height = `${(val / maxVal) * 100}%`;
         
-        if (sorted.includes(idx)) {
+        if (isSorted[idx]) {
             bar.classList.add('sorted');
         } else if (comparing.includes(idx)) {
             bar.classList.add('comparing');
@@ -46,12 +51,14 @@ export async function startSorting() {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 array: state.currentArray,
-                algorithm: algo
+                algorithm: algo,
+                sorted_format: 'runs',
+                stream: true
             })
         });
         
-        const data = await response.json();
-        await animateSorting(data.steps);
+        const { steps } = await readTrace(response);
+        await animateSorting(steps);
     } catch (error) {
         console.error('Error:', error);
         alert('Error connecting to backend. Make sure the Python server is running on ' + state.API_URL.split('/api')[0] + '.');
@@ -64,7 +71,7 @@ export async function startSorting() {
 export async function animateSorting(steps) {
     const speed = document.getElementById('sortSpeed').value;
     
-    for (let step of steps) {
+    for await (let step of steps) {
         if (!state.isAnimating) break;
         
         renderBars(
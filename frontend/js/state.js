@@ -3,6 +3,7 @@ export const state = {
     currentMaze: [],
     mazeStart: null,
     mazeEnd: null,
+    mazeRef: null,
     mlData: null,
     mlProblemType: null,
     isAnimating: false,
@@ -0,0 +1,42 @@
+// Parses one line; a run that fails mid-stream (e.g. times out) ends the
+// stream with an {"error": ...} line instead of a step
+function parseLine(line) {
+    const value = JSON.parse(line);
+    if (value.error) throw new Error(value.error);
+    return value;
+}
+
+// Reads a newline-delimited JSON response, yielding one parsed object per line
+// as soon as it arrives
+export async function* readNdjson(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    try {
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline);
+                buffer = buffer.slice(newline + 1);
+                if (line.trim()) yield parseLine(line);
+            }
+        }
+        if (buffer.trim()) yield parseLine(buffer);
+    } finally {
+        // Stops the download if the consumer bails out early (e.g. reset)
+        reader.cancel().catch(() => {});
+    }
+}
+
+// Splits a streamed trace into its first line (response metadata) and
+// an async iterator over the remaining lines (the steps)
+export async function readTrace(response) {
+    const lines = readNdjson(response);
+    const { value: meta } = await lines.next();
+    return { meta, steps: lines };
+}